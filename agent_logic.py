@@ -1,31 +1,58 @@
+from __future__ import annotations
+
 import os
+import re
+import datetime
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
-# LangChain imports
-from langchain_community.utilities import SQLDatabase
-from langchain_community.agent_toolkits import create_sql_agent
-from langchain_google_genai import GoogleGenerativeAI
+from profile_generator import PILLAR_SHORT
+
+# LangChain is imported inside the functions that need it, so importing this
+# module (e.g. from app.py at startup) does not pay the LangChain import cost.
+if TYPE_CHECKING:
+    from langchain_community.utilities import SQLDatabase
+    from langchain_google_genai import GoogleGenerativeAI
+
+# The .env file is read once at import instead of on every get_llm() call
+load_dotenv()
+API_KEY = os.getenv("GOOGLE_API_KEY")
 
-def get_llm():
+LLM_MODEL = "gemini-2.5-flash"
+# Larger model, only used as a second attempt when the fast one fails
+LLM_MODEL_HEAVY = "gemini-2.5-pro"
+
+def get_llm(model: str = LLM_MODEL):
     """
     Initializes and returns the Google Generative AI LLM.
-    Loads the API key from the .env file.
+    Uses the API key loaded from the .env file at import time.
     """
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
+    if not API_KEY:
         # In a real app, you might raise an exception or handle this more gracefully
         print("Error: GOOGLE_API_KEY not found in environment variables.")
         return None
     
+    from langchain_google_genai import GoogleGenerativeAI
+
     # Initialize and return the LLM instance
     llm = GoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        google_api_key=api_key,
+        model=model,
+        google_api_key=API_KEY,
         temperature=0.1,
     )
     return llm
 
+def get_llm_heavy():
+    """Returns the larger Gemini model, kept for questions the default model gets wrong."""
+    return get_llm(LLM_MODEL_HEAVY)
+
+# The agent is only a fallback, so its retries are capped: a question it cannot
+# answer in a few steps is not worth more tokens. On a parse error the agent is
+# told to give up rather than try again.
+AGENT_MAX_ITERATIONS = 4
+AGENT_MAX_EXECUTION_TIME = 20  # seconds
+AGENT_PARSING_ERROR_MESSAGE = "Invalid format. Reply with exactly: Final Answer: I don't know."
+
 def get_sql_agent(llm: GoogleGenerativeAI, db_engine: SQLDatabase):
     """
     Initializes and returns the LangChain SQL Agent using the provided LLM and DB engine.
@@ -37,13 +64,321 @@ def get_sql_agent(llm: GoogleGenerativeAI, db_engine: SQLDatabase):
     Returns:
         An executable LangChain agent.
     """
+    from langchain_community.agent_toolkits import create_sql_agent
+
     # Create the SQL agent. This agent is aware of the database schema 
     # and can write and execute SQL queries.
     agent_executor = create_sql_agent(
         llm=llm,
         db=db_engine,
         agent_type="zero-shot-react-description", # Generic agent type compatible with Gemini
-        verbose=True, # Set to True to see the agent's thought process in the terminal
-        handle_parsing_errors=True, # Gracefully handle cases where the LLM output is not perfect
+        verbose=os.getenv("DEBUG_AGENT") == "1", # Set DEBUG_AGENT=1 to see the agent's thought process in the terminal
+        max_iterations=AGENT_MAX_ITERATIONS,
+        max_execution_time=AGENT_MAX_EXECUTION_TIME,
+        early_stopping_method="force", # Stop with a fixed message instead of another LLM call
+        agent_executor_kwargs={
+            "return_intermediate_steps": False,
+            # Gracefully handle cases where the LLM output is not perfect
+            "handle_parsing_errors": AGENT_PARSING_ERROR_MESSAGE,
+        },
     )
     return agent_executor
+
+# --- Single-shot Text-to-SQL ---
+# The ReAct agent above needs several LLM round-trips per question (list tables,
+# describe, draft, check, execute). For this small, static schema one call that
+# returns only the SQL is enough; the agent is kept as a fallback.
+SQL_SYSTEM_PROMPT = """You are an expert SQLite analyst for the OIC Digital Economy Index (ADEI) database.
+Given a user question, write ONE syntactically correct SQLite SELECT query that answers it.
+Only use the tables and columns listed in the schema below.
+Pillar names are stored in full, e.g. 'First Pillar: Institutions'; use LIKE '%Institutions%' to match them.
+Return the SQL query only, with no explanation and no markdown code fences.
+
+SCHEMA:
+{table_info}
+"""
+
+SUMMARY_PROMPT = """Answer the user's question in plain English using only the SQL query result below.
+Be concise. If the result is empty, say that no matching data was found.
+
+QUESTION:
+{question}
+
+SQL QUERY:
+{sql}
+
+RESULT (CSV):
+{result}
+"""
+
+def build_sql_system_prompt(table_info: str) -> str:
+    """Builds the Text-to-SQL system prompt from the database schema dump."""
+    return SQL_SYSTEM_PROMPT.format(table_info=table_info)
+
+def extract_sql(llm_output: str) -> str:
+    """
+    Cleans the raw LLM output into a single SQL statement.
+
+    Raises:
+        ValueError: If the output is not a read-only SELECT query.
+    """
+    sql = llm_output.strip()
+    # Strip markdown code fences if the model added them anyway
+    if sql.startswith("```"):
+        sql = sql.strip("`").strip()
+        if sql.lower().startswith("sql"):
+            sql = sql[3:]
+    sql = sql.strip().rstrip(";").strip()
+    if not sql.lower().startswith(("select", "with")):
+        raise ValueError(f"LLM did not return a SELECT query: {llm_output!r}")
+    return sql
+
+def generate_sql(llm: GoogleGenerativeAI, question: str, system_prompt: str) -> str:
+    """
+    Asks the LLM for a single SQL query answering the question.
+
+    Args:
+        llm: An initialized LangChain LLM object.
+        question: The user's natural-language question.
+        system_prompt: The schema-aware prompt from build_sql_system_prompt(),
+            or "" when it is already held in a Gemini context cache.
+
+    Returns:
+        A read-only SQL query string.
+    """
+    raw_output = llm.invoke(f"{system_prompt}\nQUESTION: {question}\nSQL:")
+    return extract_sql(raw_output)
+
+def summarize_result(llm: GoogleGenerativeAI, question: str, sql: str, result_df, max_rows: int = 50) -> str:
+    """Turns a SQL query result into a short natural-language answer."""
+    result_csv = result_df.head(max_rows).to_csv(index=False)
+    return llm.invoke(SUMMARY_PROMPT.format(question=question, sql=sql, result=result_csv))
+
+def stream_summary(llm: GoogleGenerativeAI, question: str, sql: str, result_df, max_rows: int = 50):
+    """Same as summarize_result(), but yields the answer text as it is generated."""
+    result_csv = result_df.head(max_rows).to_csv(index=False)
+    return llm.stream(SUMMARY_PROMPT.format(question=question, sql=sql, result=result_csv))
+
+# --- Template fast path ---
+# The most common question shapes map directly onto a parameterised query, so
+# they are answered without any LLM call. Anything else falls through.
+_PILLAR_SCORES = """
+SELECT c.name AS "Country", p.pillar_name AS "Pillar", p.total_pillar_score AS "Score"
+FROM pillars p JOIN countries c ON c.id = p.country_id
+"""
+
+SQL_TEMPLATES = [
+    # "What is the Infrastructure score of Malaysia?"
+    (re.compile(
+        r"^\s*what(?:'s| is)\s+(?:the\s+)?(?!(?:the|adei|overall)\b)(?P<pillar>[\w&,\- ]+?)(?:\s+pillar)?\s+score\s+(?:of|for|in)\s+"
+        r"(?P<country>[\w'.\- ]+?)\s*\??\s*$", re.IGNORECASE),
+     _PILLAR_SCORES + "WHERE c.name = :country COLLATE NOCASE AND p.pillar_name = :pillar"),
+    # "What is the ADEI score / rank of Malaysia?"
+    (re.compile(
+        r"^\s*what(?:'s| is)\s+(?:the\s+)?(?:adei\s+|overall\s+)?(?:score|rank|ranking)\s+(?:of|for)\s+"
+        r"(?P<country>[\w'.\- ]+?)\s*\??\s*$", re.IGNORECASE),
+     'SELECT name AS "Country", adei_score AS "ADEI Score", adei_rank AS "ADEI Rank" '
+     "FROM countries WHERE name = :country COLLATE NOCASE"),
+    # "Top 5 countries by Innovation" / "Bottom 3 countries in E-Government pillar"
+    (re.compile(
+        r"^\s*(?:(?:show|list|give)\s+(?:me\s+)?|what are\s+)?(?:the\s+)?(?P<dir>top|bottom)\s+(?P<n>\d+)"
+        r"(?:\s+countries)?\s+(?:by|in|for|on)\s+(?:the\s+)?(?!(?:the|adei|overall)\b)(?P<pillar>[\w&,\- ]+?)"
+        r"(?:\s+pillar)?(?:\s+score)?\s*\??\s*$", re.IGNORECASE),
+     _PILLAR_SCORES + "WHERE p.pillar_name = :pillar "
+     "ORDER BY CASE :dir WHEN 'top' THEN -p.total_pillar_score ELSE p.total_pillar_score END LIMIT :n"),
+    # "Top 10 countries" / "Bottom 5 countries by ADEI score"
+    (re.compile(
+        r"^\s*(?:(?:show|list|give)\s+(?:me\s+)?|what are\s+)?(?:the\s+)?(?P<dir>top|bottom)\s+(?P<n>\d+)"
+        r"(?:\s+countries)?(?:\s+(?:by|in|for|on)\s+(?:the\s+)?(?:overall\s+)?(?:adei)?(?:\s*score)?)?\s*\??\s*$",
+        re.IGNORECASE),
+     'SELECT name AS "Country", adei_score AS "ADEI Score", adei_rank AS "ADEI Rank" FROM countries '
+     "ORDER BY CASE :dir WHEN 'top' THEN -adei_score ELSE adei_score END LIMIT :n"),
+]
+
+def resolve_pillar(text: str):
+    """
+    Resolves a pillar as written in a question to its full stored pillar_name.
+
+    The text must equal one pillar's label ("Innovation") or be a unique
+    whole-word prefix of one ("Market Development", "Future"); otherwise the
+    match is ambiguous or unknown and None is returned.
+    """
+    text = text.strip().lower()
+    exact = [full for full, label in PILLAR_SHORT.items() if text in (label.lower(), full.lower())]
+    if exact:
+        return exact[0]
+    prefixed = [
+        full for full, label in PILLAR_SHORT.items()
+        if label.lower().startswith(text + " ")
+    ]
+    return prefixed[0] if len(prefixed) == 1 else None
+
+def match_template(question: str):
+    """
+    Matches a question against SQL_TEMPLATES.
+
+    Returns:
+        A (sql, params) tuple for the first matching template, or None. A
+        pillar that doesn't resolve to exactly one pillar also gives None, so
+        the question goes to the LLM instead.
+    """
+    for pattern, sql in SQL_TEMPLATES:
+        match = pattern.match(question)
+        if match:
+            params = {
+                key: int(value) if key == "n" else value.strip().lower()
+                for key, value in match.groupdict().items()
+            }
+            if "pillar" in params:
+                params["pillar"] = resolve_pillar(params["pillar"])
+                if params["pillar"] is None:
+                    return None
+            return sql, params
+    return None
+
+def format_result_table(result_df, max_rows: int = 50) -> str:
+    """Renders a query result as a markdown table for the chat window."""
+    df = result_df.head(max_rows)
+    lines = [
+        "| " + " | ".join(str(col) for col in df.columns) + " |",
+        "|" + "---|" * len(df.columns),
+    ]
+    for row in df.itertuples(index=False):
+        lines.append("| " + " | ".join(f"{v:g}" if isinstance(v, float) else str(v) for v in row) + " |")
+    return "\n".join(lines)
+
+# --- Batched multi-question prompting ---
+# Several questions in one prompt share a single LLM call (and a single copy of
+# the system prompt) instead of one call each.
+BATCH_INSTRUCTIONS = """The input below contains {n} independent instances, numbered "Instance #1" to "Instance #{n}".
+Handle each instance separately and reply with exactly one block per instance,
+each starting with "Output #i:" where i is the instance number, in the same order.
+"""
+
+_OUTPUT_SPLIT_RE = re.compile(r"^\s*Output #(\d+):", re.MULTILINE)
+
+# The user's full message is sent once alongside a batch, so an instance that
+# depends on another ("...; sort by rank") keeps its subject
+BATCH_CONTEXT = """The instances are parts of this one user message; use it to resolve
+references between them (e.g. "it", "its", "sort by rank"):
+{prompt}
+"""
+
+def split_questions(prompt: str) -> list:
+    """Splits a chat prompt into separate questions on explicit ';' separators only."""
+    parts = prompt.split(";")
+    return [p.strip() for p in parts if p.strip()]
+
+def batched_ask(llm: GoogleGenerativeAI, questions: list, system_prompt: str = "") -> list:
+    """
+    Sends several instances to the LLM in one call and splits the reply.
+
+    Args:
+        llm: An initialized LangChain LLM object (or anything with .invoke()).
+        questions: The instance texts, in order.
+        system_prompt: Shared instructions sent once for the whole batch.
+
+    Returns:
+        A list with one output string per question ("" if the model skipped one).
+    """
+    instances = "\n".join(f"Instance #{i}: {q}" for i, q in enumerate(questions, start=1))
+    raw_output = llm.invoke(
+        f"{system_prompt}\n{BATCH_INSTRUCTIONS.format(n=len(questions))}\n{instances}"
+    )
+    parts = _OUTPUT_SPLIT_RE.split(raw_output)
+    # parts = [preamble, "1", text1, "2", text2, ...]
+    outputs = {int(num): text.strip() for num, text in zip(parts[1::2], parts[2::2])}
+    return [outputs.get(i, "") for i in range(1, len(questions) + 1)]
+
+def generate_sql_batch(llm: GoogleGenerativeAI, questions: list, system_prompt: str, prompt: str = "") -> list:
+    """
+    Generates one SQL query per question with a single LLM call.
+
+    Args:
+        prompt: The user's full message the questions were split from, sent
+            once as shared context.
+
+    Returns:
+        A list aligned with `questions`; entries are None where no valid
+        SELECT query came back.
+    """
+    sqls = []
+    if prompt:
+        system_prompt = f"{system_prompt}\n{BATCH_CONTEXT.format(prompt=prompt)}"
+    for output in batched_ask(llm, questions, system_prompt):
+        try:
+            sqls.append(extract_sql(output))
+        except ValueError:
+            sqls.append(None)
+    return sqls
+
+def summarize_results_batch(llm: GoogleGenerativeAI, items: list, max_rows: int = 50, prompt: str = "") -> list:
+    """
+    Summarizes several (question, sql, result_df) triples with a single LLM call.
+
+    Args:
+        prompt: The user's full message the questions were split from, sent
+            once as shared context.
+
+    Returns:
+        A list of natural-language answers aligned with `items`.
+    """
+    summaries = [
+        f"QUESTION: {question}\nSQL QUERY: {sql}\nRESULT (CSV):\n{result_df.head(max_rows).to_csv(index=False)}"
+        for question, sql, result_df in items
+    ]
+    system_prompt = (
+        "For each instance, answer the question in plain English using only the SQL query result. "
+        "Be concise. If the result is empty, say that no matching data was found."
+    )
+    if prompt:
+        system_prompt = f"{system_prompt}\n{BATCH_CONTEXT.format(prompt=prompt)}"
+    return batched_ask(llm, summaries, system_prompt)
+
+# --- Gemini context caching ---
+# The schema + instructions prefix is identical for every chatbot question, so it
+# is uploaded once to Gemini's context cache and only the question is sent per call.
+
+class CachedContextLLM:
+    """
+    Minimal stand-in for GoogleGenerativeAI.invoke() that reuses a Gemini
+    CachedContent (system prompt already stored server-side).
+    """
+    def __init__(self, cached_content):
+        import google.generativeai as genai
+        self.cached_content = cached_content
+        self.model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+
+    def invoke(self, prompt: str) -> str:
+        return self.model.generate_content(prompt).text
+
+def create_context_cache(system_instruction: str, ttl_seconds: int = 3600):
+    """
+    Stores the system prompt in Gemini's context cache.
+
+    Args:
+        system_instruction: The stable prompt prefix (schema dump + instructions).
+        ttl_seconds: How long Gemini keeps the cached context.
+
+    Returns:
+        A CachedContextLLM bound to the cache, or None if caching is unavailable
+        (missing key, prompt below the model's minimum cacheable size, etc.).
+    """
+    if not API_KEY:
+        return None
+    try:
+        # The caching API arrived in google-generativeai 0.7; an older SDK
+        # raises ImportError here and is treated like any other unavailability
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        genai.configure(api_key=API_KEY)
+        cached_content = caching.CachedContent.create(
+            model=f"models/{LLM_MODEL}",
+            system_instruction=system_instruction,
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+        return CachedContextLLM(cached_content)
+    except Exception as e:
+        print(f"Gemini context caching unavailable, sending the full prompt instead: {e}")
+        return None
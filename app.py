@@ -1,15 +1,36 @@
 import streamlit as st
 from pathlib import Path
+import json
 import sqlite3
+import threading
+import uuid
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import pydeck as pdk
 
-# LangChain imports for the chatbot
-from langchain_community.utilities import SQLDatabase
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 
 # --- Import your modularized functions ---
-from agent_logic import get_llm, get_sql_agent
+from agent_logic import (
+    get_llm,
+    get_llm_heavy,
+    get_sql_agent,
+    build_sql_system_prompt,
+    generate_sql,
+    stream_summary,
+    create_context_cache,
+    split_questions,
+    BATCH_CONTEXT,
+    generate_sql_batch,
+    summarize_results_batch,
+    match_template,
+    format_result_table,
+)
 from profile_generator import (
+    query_frame,
+    load_facts,
     get_country_list,
     get_country_profile_data,
     create_radar_chart,
@@ -19,7 +40,7 @@ from profile_generator import (
     get_average_pillar_scores,
     get_map_data,
     get_pillar_rankings,
-    get_all_pillar_names,
+    get_pillar_label_map,
     get_geo_pillar_data,
     get_pillar_correlation_matrix,
     get_oic_aggregate_stats,
@@ -27,6 +48,8 @@ from profile_generator import (
     get_peer_region_data,
     get_regional_aggregation,
     get_rankings_explorer_data,
+    get_all_pillar_scores,
+    get_score_ladder,
     get_country_region,
     get_gap_analysis_data,
     generate_swot,
@@ -112,72 +135,531 @@ st.divider()
 # --- Database Connection & Initialization ---
 DB_PATH = Path(__file__).resolve().parent / "data" / "processed" / "digital_economy.db"
 
+def connect_sqlite():
+    """Opens the dashboard's sqlite3 connection read-only with read-tuned PRAGMAs."""
+    # The app never writes to this file (the loader scripts rebuild it offline),
+    # so immutable=1 lets SQLite skip file locking and journal checks entirely.
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+    # The whole dataset fits in a 64 MiB page cache, so after warm-up every
+    # dashboard query is served from memory.
+    conn.execute("PRAGMA cache_size=-65536;")
+    conn.execute("PRAGMA mmap_size=268435456;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA query_only=1;")
+    return conn
+
 @st.cache_resource
-def get_db_engine():
-    """Initializes and caches a LangChain SQLDatabase engine for the agent."""
+def get_sqlalchemy_engine():
+    """
+    Creates one process-wide SQLAlchemy engine. StaticPool keeps a single
+    sqlite3 connection that is reused by every session instead of reopened.
+    """
     if not DB_PATH.exists():
         st.error(f"Database not found at {DB_PATH}. Please run the data loading script first.")
         st.stop()
-    return SQLDatabase.from_uri(f"sqlite:///{DB_PATH}")
+    return create_engine(f"sqlite:///{DB_PATH}", creator=connect_sqlite, poolclass=StaticPool)
+
+@st.cache_resource
+def get_db_engine():
+    """Initializes and caches a LangChain SQLDatabase engine for the agent."""
+    # Imported here so sessions that never use the chatbot skip loading LangChain.
+    from langchain_community.utilities import SQLDatabase
+    return SQLDatabase(engine=get_sqlalchemy_engine())
 
 @st.cache_resource
 def get_raw_db_connection():
-    """Creates and caches a raw sqlite3 connection for pandas queries."""
-    return sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    """Returns the sqlite3 connection behind the shared engine, for pandas queries."""
+    return get_sqlalchemy_engine().raw_connection().dbapi_connection
+
+# --- Cached data loaders ---
+# Every tab reads from the in-memory facts tables (see get_facts below). The
+# data is static per DB file, so each loader's pandas work runs once per
+# argument set instead of on every widget interaction. The leading underscore
+# tells Streamlit not to hash the facts dict.
+@st.cache_data(show_spinner=False)
+def cached_country_list(_facts):
+    return get_country_list(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_average_pillar_scores(_facts):
+    return get_average_pillar_scores(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_map_data(_facts):
+    return get_map_data(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_leaderboard_data(_facts):
+    return get_leaderboard_data(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_pillar_labels(_facts):
+    """Returns (short labels, {short label: full name}) for the pillar selectboxes."""
+    label_to_full = get_pillar_label_map(_facts)
+    return list(label_to_full), label_to_full
+
+@st.cache_data(show_spinner=False)
+def cached_oic_aggregate_stats(_facts):
+    return get_oic_aggregate_stats(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_pillar_correlation_matrix(_facts):
+    return get_pillar_correlation_matrix(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_regional_aggregation(_facts):
+    return get_regional_aggregation(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_rankings_explorer_data(_facts):
+    return get_rankings_explorer_data(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_all_pillar_scores(_facts):
+    return get_all_pillar_scores(_facts)
+
+@st.cache_data(show_spinner=False)
+def cached_score_ladder(pillar_name, _facts):
+    return get_score_ladder(pillar_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_country_profile_data(country_name: str, _facts):
+    return get_country_profile_data(country_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_comparison_data(country_names: list, _facts):
+    return get_comparison_data(country_names, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_strengths_weaknesses(country_name: str, _facts):
+    return get_country_strengths_weaknesses(country_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_peer_region_data(country_name: str, _facts):
+    return get_peer_region_data(country_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_swot(country_name: str, _facts):
+    return generate_swot(country_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_gap_analysis_data(country_name: str, _facts):
+    return get_gap_analysis_data(country_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_pillar_rankings(pillar_name: str, _facts):
+    return get_pillar_rankings(pillar_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_pillar_key_findings(pillar_name: str, _facts):
+    return get_pillar_key_findings(pillar_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_geo_pillar_data(pillar_name, _facts):
+    return get_geo_pillar_data(pillar_name, _facts)
+
+@st.cache_data(show_spinner=False)
+def cached_policy_recommendations(country_name: str, _facts):
+    return generate_policy_recommendations(country_name, _facts)
+
+# --- ADEI map (PyDeck) ---
+# Country boundaries are read from data/ and the scores joined onto them, so a
+# rerun re-sends a small pre-built layer instead of a full Plotly figure spec.
+# The file holds only the OIC countries and is built offline by
+# build_oic_geojson.py; without it the overview falls back to the Plotly map.
+OIC_GEOJSON_PATH = Path(__file__).resolve().parent / "data" / "oic_countries.geojson"
+
+@st.cache_data(show_spinner=False)
+def load_oic_boundaries(iso_codes: tuple) -> dict:
+    """
+    Returns {ISO alpha-3: geometry} for the given countries.
+
+    Raises OSError/ValueError when the boundaries file is missing or unreadable.
+    """
+    with open(OIC_GEOJSON_PATH, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    return {
+        feature["properties"]["iso_a3"]: feature["geometry"]
+        for feature in features
+        if feature["properties"]["iso_a3"] in iso_codes
+    }
+
+@st.cache_data(show_spinner=False)
+def build_adei_geojson(map_data: pd.DataFrame):
+    """
+    Returns a FeatureCollection of the OIC countries with their ADEI score and
+    a precomputed fill color. Raises like load_oic_boundaries if the
+    boundaries are unavailable.
+    """
+    scores = (
+        map_data.drop_duplicates(subset="iso_alpha")
+        .set_index("iso_alpha")[["name", "adei_score"]]
+        .to_dict("index")
+    )
+    boundaries = load_oic_boundaries(tuple(sorted(scores)))
+    lo, hi = map_data["adei_score"].min(), map_data["adei_score"].max()
+    span = (hi - lo) or 1
+
+    features = []
+    for iso, row in scores.items():
+        if iso not in boundaries:
+            continue
+        t = (row["adei_score"] - lo) / span
+        features.append({
+            "type": "Feature",
+            "geometry": boundaries[iso],
+            "properties": {
+                "name": row["name"],
+                "adei_score": int(row["adei_score"]),
+                "fill_color": [int(255 * (1 - t)), 40, int(255 * t), 200],
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+def number_columns(columns, fmt: str = "%.2f") -> dict:
+    """
+    Returns a st.dataframe column_config showing the given columns with a fixed
+    number format. Unlike DataFrame.style.format this is applied by the browser,
+    so no per-cell formatting runs in Python on each render.
+    """
+    return {col: st.column_config.NumberColumn(format=fmt) for col in columns}
+
+# Plotly figures are cached as objects, keyed on a content hash of their input
+# frame, so a rerun with unchanged data skips the figure builders entirely.
+# plotly.js config for charts that need no hover/zoom (values already printed
+# on the chart) and for those that only need hover.
+STATIC_PLOT = {"staticPlot": True, "displayModeBar": False}
+HOVER_ONLY = {"displayModeBar": False}
+
+# Draw scatter traces on a WebGL canvas instead of one SVG node per point.
+# Plotly has no WebGL bar/histogram trace, so those stay SVG.
+ENABLE_WEBGL = True
+
+def frame_key(df: pd.DataFrame) -> int:
+    """Returns a content hash of a dataframe for keying cached figures."""
+    return int(pd.util.hash_pandas_object(df).sum())
+
+@st.cache_resource(show_spinner=False)
+def build_choropleth(data_key: int, _data: pd.DataFrame, color: str, label: str, title: str = None):
+    fig = px.choropleth(
+        _data,
+        locations="iso_alpha",
+        color=color,
+        hover_name="name",
+        color_continuous_scale=px.colors.sequential.Plasma,
+        labels={color: label},
+        title=title,
+    )
+    fig.update_layout(margin={"r": 0, "t": 30 if title else 10, "l": 0, "b": 0})
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_pillar_scatter(data_key: int, _data: pd.DataFrame, label: str):
+    # The OLS trendline is fitted by statsmodels, so fit it once per dataset.
+    fig = px.scatter(
+        _data,
+        x="score",
+        y="adei_score_val",
+        hover_name="name",
+        labels={"score": label, "adei_score_val": "Overall ADEI Score"},
+        trendline="ols",
+        color="score",
+        color_continuous_scale=px.colors.sequential.Plasma,
+        render_mode="webgl" if ENABLE_WEBGL else "auto",
+    )
+    fig.update_layout(coloraxis_showscale=False, margin={"t": 10})
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_correlation_heatmap(data_key: int, _corr: pd.DataFrame):
+    fig = px.imshow(
+        _corr,
+        color_continuous_scale=px.colors.diverging.RdYlGn,
+        zmin=-1, zmax=1,
+        text_auto=".2f",
+        aspect="auto",
+    )
+    fig.update_layout(margin={"t": 10, "b": 10})
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def build_radar_chart(data_key: int, _pillars_df: pd.DataFrame):
+    return create_radar_chart(_pillars_df)
+
+@st.cache_resource(show_spinner=False)
+def build_multi_radar_chart(data_key: int, _pillars_df: pd.DataFrame):
+    return create_multi_radar_chart(_pillars_df)
+
+@st.cache_data(show_spinner=False)
+def csv_bytes(data_key: int, _df: pd.DataFrame) -> bytes:
+    """Serializes a download button's CSV once per distinct frame, not on every rerun."""
+    return _df.to_csv(index=False).encode("utf-8")
+
+# The LLM and SQL agent are only built once the chatbot receives its first
+# question, so browsing the other tabs never pays for them.
+@st.cache_resource
+def get_cached_llm():
+    """Initializes and caches the Gemini LLM."""
+    return get_llm()
+
+@st.cache_resource
+def get_cached_llm_heavy():
+    return get_llm_heavy()
+
+@st.cache_resource
+def get_agent():
+    """Initializes and caches the LangChain SQL agent."""
+    return get_sql_agent(get_cached_llm(), get_db_engine())
 
 # Initialize all necessary components (cached for performance)
-db_engine = get_db_engine()
 raw_conn = get_raw_db_connection()
-llm = get_llm()
-agent = get_sql_agent(llm, db_engine)
 
-# --- Create Tabs for Different App Sections ---
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
-    "🌍 Global Overview",
-    "📄 Country Profiles",
-    "🆚 Compare Countries",
-    "🏛️ Pillar Analysis",
-    "🗺️ Geographic Analysis",
-    "📈 Trends & Progress",
-    "🏆 Rankings Explorer",
-    "💻 Policy Recommendations",
-    "💬 Chatbot Q&A",
-])
+@st.cache_resource
+def get_facts():
+    """Loads the whole dataset into memory once per process (see load_facts)."""
+    return load_facts(raw_conn)
+
+facts = get_facts()
+
+@st.cache_resource
+def get_sql_system_prompt():
+    """Builds the Text-to-SQL prompt once; the schema dump is static per DB file."""
+    return build_sql_system_prompt(get_db_engine().get_table_info())
+
+# Refreshed slightly before the Gemini cache TTL (3600 s) expires.
+@st.cache_resource(ttl=3300)
+def get_sql_generator():
+    """
+    Returns (llm, prompt_prefix) for SQL generation. When Gemini context caching
+    is available the schema prompt lives server-side and the prefix is empty.
+    """
+    system_prompt = get_sql_system_prompt()
+    cached_llm = create_context_cache(system_prompt, ttl_seconds=3600)
+    if cached_llm is not None:
+        return cached_llm, ""
+    return get_cached_llm(), system_prompt
+
+def run_query(sql: str, params=None) -> pd.DataFrame:
+    """Runs a chatbot query on raw_conn (see profile_generator.query_frame)."""
+    return query_frame(raw_conn, sql, params)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def answer_question(prompt: str):
+    """
+    Answers a chatbot question with one SQL-generation call and a direct query
+    on raw_conn. If the SQL cannot be parsed or executed it is retried once on
+    the heavy model, then handed to the SQL agent. Cached per prompt text.
+
+    Returns:
+        The finished answer text, or a (sql, result_df) pair whose summary the
+        caller streams into the chat.
+    """
+    questions = split_questions(prompt)
+    if len(questions) > 1:
+        return answer_questions_batch(questions, prompt)
+    templated = answer_from_template(prompt)
+    if templated is not None:
+        return templated
+    try:
+        sql_llm, prompt_prefix = get_sql_generator()
+        sql = generate_sql(sql_llm, prompt, prompt_prefix)
+        result_df = run_query(sql)
+    except Exception:
+        try:
+            sql, result_df = run_sql_on_heavy_model(prompt)
+        except Exception:
+            return get_agent().invoke({"input": prompt})["output"]
+    return sql, result_df
+
+def run_sql_on_heavy_model(question: str):
+    """Second attempt at the SQL with the larger model; raises if it fails too."""
+    sql = generate_sql(get_cached_llm_heavy(), question, get_sql_system_prompt())
+    return sql, run_query(sql)
+
+def answer_from_template(question: str):
+    """Answers a common question shape without the LLM; None if no template applies."""
+    template = match_template(question)
+    if template is None:
+        return None
+    sql, params = template
+    try:
+        result_df = run_query(sql, params)
+    except Exception:
+        return None
+    # An empty result usually means the regex caught a name it cannot resolve
+    # (e.g. "Turkey" vs "Türkiye"); let the LLM handle it.
+    return format_result_table(result_df) if not result_df.empty else None
+
+def answer_questions_batch(questions: list, prompt: str) -> str:
+    """
+    Answers several questions with one batched SQL-generation call and one
+    batched summary call. Templated questions skip the LLM; questions whose
+    SQL fails are retried on the heavy model, then go through the agent.
+    The full prompt goes with each batch so dependent questions keep context.
+    """
+    answers = [answer_from_template(q) for q in questions]
+    pending = [i for i, answer in enumerate(answers) if answer is None]
+    # A failed batch call falls back per question, like the single-question
+    # path, instead of losing the answers already built
+    try:
+        sql_llm, prompt_prefix = get_sql_generator()
+        sqls = generate_sql_batch(sql_llm, [questions[i] for i in pending], prompt_prefix, prompt) if pending else []
+    except Exception:
+        sqls = [None] * len(pending)
+
+    executed = []
+    for i, sql in zip(pending, sqls):
+        question = questions[i]
+        try:
+            if sql is None:
+                raise ValueError("No SQL generated")
+            executed.append((i, (question, sql, run_query(sql))))
+        except Exception:
+            # Asked on their own, the fallbacks get the full prompt as context
+            in_context = f"{question}\n\n{BATCH_CONTEXT.format(prompt=prompt)}"
+            try:
+                executed.append((i, (question, *run_sql_on_heavy_model(in_context))))
+            except Exception:
+                try:
+                    answers[i] = get_agent().invoke({"input": in_context})["output"]
+                except Exception as e:
+                    answers[i] = f"Sorry, I encountered an error: {e}"
+
+    if executed:
+        try:
+            summaries = summarize_results_batch(get_cached_llm(), [item for _, item in executed], prompt=prompt)
+        except Exception:
+            # The query results are still worth showing without a summary
+            summaries = [format_result_table(result_df) for _, (_, _, result_df) in executed]
+        for (i, _), summary in zip(executed, summaries):
+            answers[i] = summary
+
+    return "\n\n".join(f"**{q}**\n\n{a}" for q, a in zip(questions, answers))
+
+@st.cache_resource(ttl=3600)
+def get_summary_cache() -> dict:
+    """
+    Finished chatbot summaries keyed on prompt text. answer_question caches the
+    SQL result, but its summary is streamed, so the text is kept here to turn a
+    repeated question into a lookup. Cleared on the same TTL as the answers.
+    """
+    return {}
+
+
+# --- Chat history ---
+# Only the last CHAT_HISTORY_WINDOW messages are kept in session_state and
+# re-rendered on each rerun; the full log goes to its own SQLite file (the
+# dashboard DB is opened read-only) and older turns are loaded on request.
+CHAT_LOG_PATH = Path(__file__).resolve().parent / "data" / "chat_log.db"
+CHAT_HISTORY_WINDOW = 20
+
+@st.cache_resource
+def get_chat_log():
+    """
+    Opens the chat log once per process and creates its table.
+
+    Reusing one connection keeps sqlite3's prepared-statement cache warm, so
+    the INSERT and SELECT below are compiled once rather than on every message.
+    Sessions run on separate threads, so callers hold the returned lock.
+    """
+    conn = sqlite3.connect(str(CHAT_LOG_PATH), check_same_thread=False)
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_log (
+                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role       TEXT NOT NULL,
+                content    TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_log_session ON chat_log (session_id, id)")
+    return conn, threading.Lock()
+
+def log_chat_message(session_id: str, role: str, content: str):
+    conn, lock = get_chat_log()
+    with lock, conn:
+        conn.execute(
+            "INSERT INTO chat_log (session_id, role, content) VALUES (?, ?, ?)",
+            (session_id, role, content),
+        )
+
+# The log is append-only, so a session's first `limit` messages never change
+# and the "earlier messages" view can be served from cache on every rerun.
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_chat_history(session_id: str, limit: int) -> list:
+    """Returns the first `limit` messages logged for a session, oldest first."""
+    conn, lock = get_chat_log()
+    with lock:
+        rows = conn.execute(
+            "SELECT role, content FROM chat_log WHERE session_id = ? ORDER BY id LIMIT ?",
+            (session_id, limit),
+        ).fetchall()
+    return [{"role": role, "content": content} for role, content in rows]
+
+def add_chat_message(role: str, content: str):
+    """Logs a message and appends it to the bounded in-session history."""
+    log_chat_message(st.session_state.qa_session_id, role, content)
+    st.session_state.qa_total += 1
+    st.session_state.qa_messages = (
+        st.session_state.qa_messages + [{"role": role, "content": content}]
+    )[-CHAT_HISTORY_WINDOW:]
+
 
 # --- Tab 1: Global Overview ---
-with tab1:
+@st.fragment
+def render_global_overview(facts):
     st.header("Global Overview of the OIC Digital Economy Landscape")
 
     # Aggregate Pillar Statistics
     st.subheader("Average Performance Across All Pillars")
-    avg_pillar_scores = get_average_pillar_scores(raw_conn)
+    avg_pillar_scores = cached_average_pillar_scores(facts)
     
     cols = st.columns(len(avg_pillar_scores))
-    for i, row in avg_pillar_scores.iterrows():
-        with cols[i]:
-            st.metric(label=row['pillar_name'], value=f"{row['average_score']:.1f}")
+    for col, row in zip(cols, avg_pillar_scores.itertuples(index=False)):
+        with col:
+            st.metric(label=row.pillar_name, value=f"{row.average_score:.1f}")
     
     st.divider()
 
     # Choropleth Map
     st.subheader("Geographic Distribution of ADEI Scores")
-    map_data = get_map_data(raw_conn)
-    fig = px.choropleth(
-        map_data,
-        locations="iso_alpha",
-        color="adei_score",
-        hover_name="name",
-        color_continuous_scale=px.colors.sequential.Plasma,
-        title="ADEI Scores Across OIC Countries"
-    )
-    fig.update_layout(margin={"r":0,"t":30,"l":0,"b":0})
-    st.plotly_chart(fig, use_container_width=True)
+    map_data = cached_map_data(facts)
+    try:
+        adei_geojson = build_adei_geojson(map_data)
+    except (OSError, ValueError):
+        adei_geojson = None
+    if adei_geojson is not None:
+        layer = pdk.Layer(
+            "GeoJsonLayer",
+            data=adei_geojson,
+            get_fill_color="properties.fill_color",
+            get_line_color=[255, 255, 255],
+            line_width_min_pixels=0.5,
+            pickable=True,
+        )
+        st.pydeck_chart(
+            pdk.Deck(
+                layers=[layer],
+                initial_view_state=pdk.ViewState(latitude=20, longitude=30, zoom=1.3),
+                tooltip={"text": "{name}\nADEI score: {adei_score}"},
+            ),
+            use_container_width=True,
+        )
+        st.caption("Colour runs from red (lowest ADEI score) to blue (highest).")
+    else:
+        # Boundaries unavailable (e.g. offline deploy): fall back to Plotly
+        fig = build_choropleth(
+            frame_key(map_data), map_data, "adei_score", "ADEI Score",
+            title="ADEI Scores Across OIC Countries",
+        )
+        st.plotly_chart(fig, use_container_width=True, config=HOVER_ONLY)
 
     st.divider()
 
     # Leaderboards
     st.subheader("Country Rankings")
-    top_10, bottom_10 = get_leaderboard_data(raw_conn)
+    top_10, bottom_10 = cached_leaderboard_data(facts)
     
     col1, col2 = st.columns(2)
     with col1:
@@ -192,12 +674,11 @@ with tab1:
     # OIC Aggregate Scorecard
     st.subheader("OIC Aggregate Scorecard — Pillar Statistics")
     st.caption("Mean, Median, Q1 and Q3 calculated across all 57 OIC member states (2025 baseline).")
-    oic_stats = get_oic_aggregate_stats(raw_conn)
+    oic_stats = cached_oic_aggregate_stats(facts).rename(columns={"pillar_name": "Pillar"}).set_index("Pillar")
     st.dataframe(
-        oic_stats.rename(columns={"pillar_name": "Pillar"})
-        .set_index("Pillar")
-        .style.format("{:.1f}"),
+        oic_stats,
         use_container_width=True,
+        column_config=number_columns(oic_stats.columns, "%.1f"),
     )
 
     st.divider()
@@ -205,23 +686,15 @@ with tab1:
     # Pillar Correlation Heatmap
     st.subheader("Pillar Correlation Heatmap")
     st.caption("Pearson correlation of pillar scores across all 57 countries. Values close to 1 indicate pillars that tend to move together.")
-    corr_matrix = get_pillar_correlation_matrix(raw_conn)
-    fig_corr = px.imshow(
-        corr_matrix,
-        color_continuous_scale=px.colors.diverging.RdYlGn,
-        zmin=-1, zmax=1,
-        text_auto=".2f",
-        aspect="auto",
-    )
-    fig_corr.update_layout(margin={"t": 10, "b": 10})
-    st.plotly_chart(fig_corr, use_container_width=True)
+    corr_matrix = cached_pillar_correlation_matrix(facts)
+    fig_corr = build_correlation_heatmap(frame_key(corr_matrix), corr_matrix)
+    st.plotly_chart(fig_corr, use_container_width=True, config=STATIC_PLOT)
 
 # --- Tab 2: Country Profiles ---
-with tab2:
+@st.fragment
+def render_country_profiles(facts, country_list):
     st.header("Generate a Profile for a Specific Country")
     
-    country_list = get_country_list(raw_conn)
-    
     selected_country = st.selectbox(
         "Select a country to view its profile:",
         options=country_list,
@@ -229,17 +702,17 @@ with tab2:
     )
 
     if selected_country:
-        profile_data = get_country_profile_data(selected_country, raw_conn)
+        profile_data = cached_country_profile_data(selected_country, facts)
         main_stats, pillars_df, sub_pillars_df = profile_data["main_stats"], profile_data["pillars_df"], profile_data["sub_pillars_df"]
 
         st.markdown(f"## Profile for: **{selected_country}**")
 
         # ── Styled KPI card row ──────────────────────────────────────────────
-        adei_score = int(main_stats['adei_score'].iloc[0])
-        adei_rank  = int(main_stats['adei_rank'].iloc[0])
+        adei_score = int(main_stats['adei_score'])
+        adei_rank  = int(main_stats['adei_rank'])
         n_pillars  = len(pillars_df)
         top_pillar_row = pillars_df.loc[pillars_df['total_pillar_score'].idxmax()]
-        top_pillar_lbl = top_pillar_row['pillar_name'].split(": ", 1)[-1] if ": " in top_pillar_row['pillar_name'] else top_pillar_row['pillar_name']
+        top_pillar_lbl = top_pillar_row['pillar_name']
         top_pillar_score = top_pillar_row['total_pillar_score']
 
         st.markdown(f"""
@@ -273,8 +746,8 @@ with tab2:
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("##### Performance Radar")
-            radar_chart = create_radar_chart(pillars_df)
-            st.plotly_chart(radar_chart, use_container_width=True)
+            radar_chart = build_radar_chart(frame_key(pillars_df), pillars_df)
+            st.plotly_chart(radar_chart, use_container_width=True, config=STATIC_PLOT)
         with col2:
             st.markdown("##### Pillar Scores (Bar Chart)")
             pillars_df_sorted = pillars_df.sort_values(by="total_pillar_score", ascending=False)
@@ -286,37 +759,41 @@ with tab2:
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("##### Pillar Scores (Table)")
-            st.dataframe(pillars_df.style.format({'total_pillar_score': '{:.2f}'}), use_container_width=True, hide_index=True)
+            st.dataframe(pillars_df, use_container_width=True, hide_index=True, column_config=number_columns(['total_pillar_score']))
         with col2:
             st.markdown("##### Detailed Indicator Scores")
-            st.dataframe(sub_pillars_df.style.format({'score': '{:.2f}'}), use_container_width=True, hide_index=True, height=400)
+            st.dataframe(sub_pillars_df, use_container_width=True, hide_index=True, height=400, column_config=number_columns(['score']))
 
         st.divider()
 
         # Strengths & Weaknesses
         st.subheader("Strengths & Weaknesses")
-        strengths, weaknesses = get_country_strengths_weaknesses(selected_country, raw_conn)
+        strengths, weaknesses = cached_strengths_weaknesses(selected_country, facts)
 
+        # One table per side instead of a st.metric element per indicator
+        indicator_columns = {"indicator": "Indicator", "pillar_name": "Pillar", "score": "Score"}
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("##### 🟢 Top 5 Indicators")
-            for _, r in strengths.iterrows():
-                st.metric(
-                    label=f"{r['indicator']} ({r['pillar_name']})",
-                    value=f"{r['score']:.1f}",
-                )
+            st.dataframe(
+                strengths[list(indicator_columns)].rename(columns=indicator_columns),
+                use_container_width=True,
+                hide_index=True,
+                column_config=number_columns(["Score"], "%.1f"),
+            )
         with col2:
             st.markdown("##### 🔴 Bottom 5 Indicators")
-            for _, r in weaknesses.iterrows():
-                st.metric(
-                    label=f"{r['indicator']} ({r['pillar_name']})",
-                    value=f"{r['score']:.1f}",
-                )
+            st.dataframe(
+                weaknesses[list(indicator_columns)].rename(columns=indicator_columns),
+                use_container_width=True,
+                hide_index=True,
+                column_config=number_columns(["Score"], "%.1f"),
+            )
 
         st.divider()
 
         # Peer Group Comparison
-        peer_df, peer_region = get_peer_region_data(selected_country, raw_conn)
+        peer_df, peer_region = cached_peer_region_data(selected_country, facts)
         st.subheader(f"Peer Group Comparison — {peer_region} Region")
         if len(peer_df['name'].unique()) > 1:
             fig_peer = px.bar(
@@ -332,7 +809,7 @@ with tab2:
                 },
             )
             fig_peer.update_layout(xaxis_tickangle=-30, margin={"t": 10, "b": 100})
-            st.plotly_chart(fig_peer, use_container_width=True)
+            st.plotly_chart(fig_peer, use_container_width=True, config=HOVER_ONLY)
         else:
             st.info("No regional peers found in the dataset for this country.")
 
@@ -340,7 +817,7 @@ with tab2:
 
         # ── SWOT Analysis ────────────────────────────────────────────────────
         st.subheader("SWOT Analysis")
-        swot = generate_swot(selected_country, raw_conn)
+        swot = cached_swot(selected_country, facts)
         if swot:
             def _li(items):
                 return "".join(f"<li>{i}</li>" for i in items)
@@ -369,7 +846,7 @@ with tab2:
 
         # ── Gap Analysis chart ───────────────────────────────────────────────
         st.subheader("Gap Analysis vs Top-5 OIC Average")
-        gap_df = get_gap_analysis_data(selected_country, raw_conn)
+        gap_df = cached_gap_analysis_data(selected_country, facts)
         if not gap_df.empty:
             gap_long = gap_df.melt(
                 id_vars='pillar_name',
@@ -396,24 +873,27 @@ with tab2:
                 labels={'pillar_name': 'Pillar', 'Score': 'Score', 'Series': ''},
             )
             fig_gap.update_layout(xaxis_tickangle=-30, margin={'t': 10, 'b': 100})
-            st.plotly_chart(fig_gap, use_container_width=True)
+            st.plotly_chart(fig_gap, use_container_width=True, config=HOVER_ONLY)
 
 # --- Tab 3: Compare Countries ---
-with tab3:
+@st.fragment
+def render_compare_countries(facts, country_list):
     st.header("Compare Countries Side-by-Side")
     
-    country_list_for_compare = get_country_list(raw_conn)
-    
     _preferred_defaults = ["United Arab Emirates", "Saudi Arabia", "Malaysia", "Turkey"]
-    _safe_defaults = [c for c in _preferred_defaults if c in country_list_for_compare]
-    selected_countries = st.multiselect(
-        "Select two or more countries to compare:",
-        options=country_list_for_compare,
-        default=_safe_defaults,
-    )
+    _safe_defaults = [c for c in _preferred_defaults if c in country_list]
+    # A form only reruns on submit, so picking several countries in a row
+    # triggers one comparison instead of one per pick.
+    with st.form("compare_form"):
+        selected_countries = st.multiselect(
+            "Select two or more countries to compare:",
+            options=country_list,
+            default=_safe_defaults,
+        )
+        st.form_submit_button("Compare")
 
     if len(selected_countries) >= 2:
-        main_stats_df, pillars_df = get_comparison_data(selected_countries, raw_conn)
+        main_stats_df, pillars_df = cached_comparison_data(selected_countries, facts)
 
         st.subheader("Overall Score & Rank Comparison")
         st.dataframe(main_stats_df.set_index("name"), use_container_width=True)
@@ -421,38 +901,35 @@ with tab3:
         st.divider()
 
         st.subheader("Pillar Score Comparison (Grouped Bar Chart)")
-        pivot_df = pillars_df.pivot_table(index='pillar_name', columns='name', values='total_pillar_score')
+        pivot_df = pillars_df.pivot(index='pillar_name', columns='name', values='total_pillar_score')
         st.bar_chart(pivot_df, height=500)
 
         st.divider()
 
         st.subheader("Pillar Performance Radar — Overlay")
-        multi_radar = create_multi_radar_chart(pillars_df)
+        multi_radar = build_multi_radar_chart(frame_key(pillars_df), pillars_df)
         st.plotly_chart(multi_radar, use_container_width=True)
 
         st.divider()
 
         st.markdown("##### Raw Pillar Data Table")
-        st.dataframe(pivot_df.style.format("{:.2f}"), use_container_width=True)
+        st.dataframe(pivot_df, use_container_width=True, column_config=number_columns(pivot_df.columns))
 
     else:
         st.warning("Please select at least two countries to start the comparison.")
 
 # --- Tab 4: Pillar Analysis ---
-with tab4:
+@st.fragment
+def render_pillar_analysis(facts, pillar_labels, pillar_label_to_full):
     st.header("Pillar-by-Pillar Analysis Across All OIC Countries")
 
-    all_pillar_names = get_all_pillar_names(raw_conn)
-    pillar_labels = [n.split(": ", 1)[-1] if ": " in n else n for n in all_pillar_names]
-    pillar_label_to_full = dict(zip(pillar_labels, all_pillar_names))
-
     selected_pillar_label = st.selectbox(
         "Select a pillar to analyse:",
         options=pillar_labels,
     )
     selected_pillar_full = pillar_label_to_full[selected_pillar_label]
 
-    pillar_countries_df, pillar_sub_df = get_pillar_rankings(selected_pillar_full, raw_conn)
+    pillar_countries_df, pillar_sub_df = cached_pillar_rankings(selected_pillar_full, facts)
 
     st.subheader(f"Country Rankings — {selected_pillar_label}")
 
@@ -487,17 +964,17 @@ with tab4:
         st.markdown("##### Full Country Ranking")
         st.dataframe(
             pillar_countries_df.set_index("pillar_rank")
-            .rename(columns={"name": "Country", "total_pillar_score": "Score", "adei_rank": "ADEI Rank"})
-            .style.format({"Score": "{:.2f}"}),
+            .rename(columns={"name": "Country", "total_pillar_score": "Score", "adei_rank": "ADEI Rank"}),
             use_container_width=True,
             height=420,
+            column_config=number_columns(["Score"]),
         )
 
     st.divider()
 
     st.subheader(f"Sub-Indicator Heatmap — {selected_pillar_label}")
     if not pillar_sub_df.empty:
-        heatmap_pivot = pillar_sub_df.pivot_table(
+        heatmap_pivot = pillar_sub_df.pivot(
             index="indicator", columns="name", values="score"
         )
         # Sort columns by pillar score (best to worst)
@@ -516,7 +993,7 @@ with tab4:
         st.plotly_chart(fig_heat, use_container_width=True)
 
     # ── Key Findings insight box ─────────────────────────────────────────────
-    findings = get_pillar_key_findings(selected_pillar_full, raw_conn)
+    findings = cached_pillar_key_findings(selected_pillar_full, facts)
     if findings:
         st.markdown(f"""
 <div class="insight-box">
@@ -530,14 +1007,12 @@ with tab4:
 </div>
 """, unsafe_allow_html=True)
 
-with tab5:
+# --- Tab 5: Geographic Analysis ---
+@st.fragment
+def render_geographic_analysis(facts, pillar_labels, pillar_label_to_full):
     st.header("Geographic Analysis of the OIC Digital Economy")
 
-    geo_pillar_names = get_all_pillar_names(raw_conn)
-    geo_pillar_labels = [n.split(": ", 1)[-1] if ": " in n else n for n in geo_pillar_names]
-    geo_label_to_full = dict(zip(geo_pillar_labels, geo_pillar_names))
-
-    geo_options = ["Overall ADEI Score"] + geo_pillar_labels
+    geo_options = ["Overall ADEI Score"] + pillar_labels
     selected_geo_metric = st.selectbox(
         "Select metric to map:",
         options=geo_options,
@@ -545,25 +1020,17 @@ with tab5:
     )
 
     if selected_geo_metric == "Overall ADEI Score":
-        geo_df = get_geo_pillar_data(None, raw_conn)
+        geo_df = cached_geo_pillar_data(None, facts)
         metric_label = "Overall ADEI Score"
     else:
-        geo_df = get_geo_pillar_data(geo_label_to_full[selected_geo_metric], raw_conn)
+        geo_df = cached_geo_pillar_data(pillar_label_to_full[selected_geo_metric], facts)
         metric_label = selected_geo_metric
 
     st.divider()
 
     # --- Choropleth ---
     st.subheader(f"Choropleth Map — {metric_label}")
-    fig_choro = px.choropleth(
-        geo_df,
-        locations="iso_alpha",
-        color="score",
-        hover_name="name",
-        color_continuous_scale=px.colors.sequential.Plasma,
-        labels={"score": metric_label},
-    )
-    fig_choro.update_layout(margin={"r": 0, "t": 10, "l": 0, "b": 0})
+    fig_choro = build_choropleth(frame_key(geo_df), geo_df, "score", metric_label)
     st.plotly_chart(fig_choro, use_container_width=True)
 
     st.divider()
@@ -587,11 +1054,12 @@ with tab5:
         # --- Top / Bottom bar ---
         st.subheader("Top 10 vs Bottom 10")
         geo_sorted = geo_df.sort_values("score", ascending=False)
-        top10_geo = geo_sorted.head(10).copy()
-        top10_geo["group"] = "Top 10"
-        bot10_geo = geo_sorted.tail(10).copy()
-        bot10_geo["group"] = "Bottom 10"
-        tb_df = pd.concat([top10_geo, bot10_geo])
+        # Clamped like head(10)/tail(10), for pillars with fewer than 10 countries
+        n = min(10, len(geo_sorted))
+        tb_idx = np.r_[:n, -n:0]
+        tb_df = geo_sorted.iloc[tb_idx].assign(
+            group=np.where(np.arange(len(tb_idx)) < n, "Top 10", "Bottom 10")
+        )
         fig_tb = px.bar(
             tb_df,
             x="name",
@@ -608,26 +1076,16 @@ with tab5:
     # --- Scatter: selected metric vs Overall ADEI ---
     if selected_geo_metric != "Overall ADEI Score":
         st.subheader(f"Pillar Score vs Overall ADEI — {metric_label}")
-        overall_df = get_geo_pillar_data(None, raw_conn).rename(columns={"score": "adei_score_val"})
-        scatter_df = geo_df.merge(overall_df[["name", "adei_score_val"]], on="name", how="inner")
-        fig_scatter = px.scatter(
-            scatter_df,
-            x="score",
-            y="adei_score_val",
-            hover_name="name",
-            labels={"score": metric_label, "adei_score_val": "Overall ADEI Score"},
-            trendline="ols",
-            color="score",
-            color_continuous_scale=px.colors.sequential.Plasma,
-        )
-        fig_scatter.update_layout(coloraxis_showscale=False, margin={"t": 10})
+        # geo_df already carries each country's overall ADEI score
+        scatter_df = geo_df[["name", "score", "adei_score"]].rename(columns={"adei_score": "adei_score_val"})
+        fig_scatter = build_pillar_scatter(frame_key(scatter_df), scatter_df, metric_label)
         st.plotly_chart(fig_scatter, use_container_width=True)
 
     st.divider()
 
     # Regional Aggregation
     st.subheader("Regional Aggregation")
-    adei_avg, pillar_avg = get_regional_aggregation(raw_conn)
+    adei_avg, pillar_avg = cached_regional_aggregation(facts)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -658,7 +1116,8 @@ with tab5:
         st.plotly_chart(fig_pie, use_container_width=True)
 
     st.markdown("##### Average Pillar Scores by Region (Heatmap)")
-    reg_pivot = pillar_avg.pivot_table(index="region", columns="pillar_name", values="total_pillar_score")
+    # pillar_avg is already one row per (region, pillar), so no aggregation is needed
+    reg_pivot = pillar_avg.pivot(index="region", columns="pillar_name", values="total_pillar_score")
     fig_reg_heat = px.imshow(
         reg_pivot,
         color_continuous_scale=px.colors.diverging.RdYlGn,
@@ -671,7 +1130,8 @@ with tab5:
 
 
 # --- Tab 6: Trends & Progress ---
-with tab6:
+@st.fragment
+def render_trends_progress(facts, pillar_labels, pillar_label_to_full):
     st.header("Trends & Progress — 2025 Baseline")
     st.info(
         "The current dataset covers a single reference year (2025). "
@@ -679,18 +1139,8 @@ with tab6:
         "time-series trend lines will be activated automatically."
     )
 
-    t6_pillar_names = get_all_pillar_names(raw_conn)
-    t6_pillar_labels = [n.split(": ", 1)[-1] if ": " in n else n for n in t6_pillar_names]
-    t6_label_to_full = dict(zip(t6_pillar_labels, t6_pillar_names))
-
     st.subheader("Score Distribution per Pillar (Box Plot)")
-    all_pillar_q = """
-    SELECT c.name, c.adei_rank, p.pillar_name, p.total_pillar_score
-    FROM pillars p JOIN countries c ON p.country_id = c.id;
-    """
-    all_pillar_df = pd.read_sql_query(all_pillar_q, raw_conn)
-    all_pillar_df['pillar_name'] = all_pillar_df['pillar_name'].str.replace(
-        r'^\w+\sPillar:\s', '', regex=True)
+    all_pillar_df = cached_all_pillar_scores(facts)
     fig_box = px.box(
         all_pillar_df,
         x="pillar_name",
@@ -708,24 +1158,14 @@ with tab6:
     st.subheader("Country Score Ladder — Select a Pillar")
     t6_selected_label = st.selectbox(
         "Pillar for ladder view:",
-        options=["Overall ADEI Score"] + t6_pillar_labels,
+        options=["Overall ADEI Score"] + pillar_labels,
         key="t6_pillar",
     )
     if t6_selected_label == "Overall ADEI Score":
-        ladder_q = "SELECT name, adei_score AS score, adei_rank AS rank FROM countries ORDER BY adei_rank;"
-        ladder_df = pd.read_sql_query(ladder_q, raw_conn)
-        ladder_label = "Overall ADEI Score"
+        ladder_df = cached_score_ladder(None, facts)
     else:
-        t6_full = t6_label_to_full[t6_selected_label]
-        ladder_q = """
-        SELECT c.name, p.total_pillar_score AS score,
-               RANK() OVER (ORDER BY p.total_pillar_score DESC) AS rank
-        FROM pillars p JOIN countries c ON p.country_id = c.id
-        WHERE p.pillar_name = ?
-        ORDER BY p.total_pillar_score DESC;
-        """
-        ladder_df = pd.read_sql_query(ladder_q, raw_conn, params=(t6_full,))
-        ladder_label = t6_selected_label
+        ladder_df = cached_score_ladder(pillar_label_to_full[t6_selected_label], facts)
+    ladder_label = t6_selected_label
 
     fig_ladder = px.bar(
         ladder_df,
@@ -749,26 +1189,28 @@ with tab6:
     st.divider()
 
     st.subheader("OIC Statistical Summary — All Pillars")
-    oic_stats_t6 = get_oic_aggregate_stats(raw_conn)
+    oic_stats_t6 = cached_oic_aggregate_stats(facts)
+    oic_stats_t6_table = oic_stats_t6.rename(columns={"pillar_name": "Pillar"}).set_index("Pillar")
     st.dataframe(
-        oic_stats_t6.rename(columns={"pillar_name": "Pillar"}).set_index("Pillar")
-        .style.format("{:.1f}"),
+        oic_stats_t6_table,
         use_container_width=True,
+        column_config=number_columns(oic_stats_t6_table.columns, "%.1f"),
     )
     st.download_button(
         "⬇️ Download Summary CSV",
-        data=oic_stats_t6.to_csv(index=False),
+        data=csv_bytes(frame_key(oic_stats_t6), oic_stats_t6),
         file_name="oic_pillar_stats_2025.csv",
         mime="text/csv",
     )
 
 
 # --- Tab 7: Rankings Explorer ---
-with tab7:
+@st.fragment
+def render_rankings_explorer(facts):
     st.header("Rankings Explorer — All 57 Countries × 9 Pillars")
     st.caption("Click any column header to sort. Use the search box to filter countries.")
 
-    rankings_df = get_rankings_explorer_data(raw_conn)
+    rankings_df = cached_rankings_explorer_data(facts)
 
     search_query = st.text_input("🔍 Search country:", placeholder="e.g. Malaysia")
     if search_query:
@@ -779,34 +1221,34 @@ with tab7:
     pillar_cols = [c for c in rankings_df.columns if c not in ['Country', 'Rank', 'ADEI Score']]
 
     st.dataframe(
-        rankings_df.set_index("Rank")
-        .style.format({c: "{:.1f}" for c in ["ADEI Score"] + pillar_cols}),
+        rankings_df.set_index("Rank"),
         use_container_width=True,
         height=700,
+        column_config=number_columns(["ADEI Score"] + pillar_cols, "%.1f"),
     )
 
     st.download_button(
         "⬇️ Download Full Rankings CSV",
-        data=rankings_df.to_csv(index=False),
+        data=csv_bytes(frame_key(rankings_df), rankings_df),
         file_name="oic_full_rankings_2025.csv",
         mime="text/csv",
     )
 
 
 # --- Tab 8: Policy Recommendations ---
-with tab8:
+@st.fragment
+def render_policy_recommendations(facts, country_list):
     st.header("Policy Recommendations")
     st.markdown("Evidence-based strategic priorities auto-generated from each country's pillar performance relative to OIC averages.")
 
-    country_list_pol = get_country_list(raw_conn)
     pol_country = st.selectbox(
         "Select a country:",
-        options=country_list_pol,
-        index=country_list_pol.index("United Arab Emirates") if "United Arab Emirates" in country_list_pol else 0,
+        options=country_list,
+        index=country_list.index("United Arab Emirates") if "United Arab Emirates" in country_list else 0,
         key="pol_country",
     )
 
-    recos = generate_policy_recommendations(pol_country, raw_conn)
+    recos = cached_policy_recommendations(pol_country, facts)
     if recos:
         st.markdown(f"### Top 5 Priority Areas for **{pol_country}**")
         for r in recos:
@@ -838,11 +1280,20 @@ with tab8:
 
 
 # --- Tab 9: Chatbot Q&A ---
-with tab9:
+@st.fragment
+def render_chatbot():
     st.header("Ask Questions to the Digital Economy Database")
 
     if "qa_messages" not in st.session_state:
         st.session_state.qa_messages = []
+        st.session_state.qa_total = 0
+        st.session_state.qa_session_id = uuid.uuid4().hex
+
+    hidden = st.session_state.qa_total - len(st.session_state.qa_messages)
+    if hidden > 0 and st.toggle(f"Show {hidden} earlier messages", key="qa_show_earlier"):
+        for message in load_chat_history(st.session_state.qa_session_id, hidden):
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
 
     for message in st.session_state.qa_messages:
         with st.chat_message(message["role"]):
@@ -850,15 +1301,69 @@ with tab9:
 
     if prompt := st.chat_input("e.g., What is the 'Rule of Law' score for Saudi Arabia?"):
         st.chat_message("user").markdown(prompt)
-        st.session_state.qa_messages.append({"role": "user", "content": prompt})
+        add_chat_message("user", prompt)
 
         with st.spinner("Thinking..."):
             try:
-                response = agent.invoke({"input": prompt})
-                response_content = response["output"]
+                answer = answer_question(prompt)
             except Exception as e:
-                response_content = f"Sorry, I encountered an error: {e}"
+                answer = f"Sorry, I encountered an error: {e}"
 
         with st.chat_message("assistant"):
-            st.markdown(response_content)
-        st.session_state.qa_messages.append({"role": "assistant", "content": response_content})
+            if isinstance(answer, str):
+                response_content = answer
+                st.markdown(response_content)
+            else:
+                # Stream the summary so the first words show up right away
+                sql, result_df = answer
+                summaries = get_summary_cache()
+                if prompt in summaries:
+                    response_content = summaries[prompt]
+                    st.markdown(response_content)
+                else:
+                    try:
+                        response_content = st.write_stream(
+                            stream_summary(get_cached_llm(), prompt, sql, result_df)
+                        )
+                        summaries[prompt] = response_content
+                    except Exception as e:
+                        response_content = f"Sorry, I encountered an error: {e}"
+                        st.markdown(response_content)
+        add_chat_message("assistant", response_content)
+
+
+# --- Create Tabs for Different App Sections ---
+# Shared by several tabs; looked up once per run instead of once per tab.
+country_list = cached_country_list(facts)
+pillar_labels, pillar_label_to_full = cached_pillar_labels(facts)
+
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
+    "🌍 Global Overview",
+    "📄 Country Profiles",
+    "🆚 Compare Countries",
+    "🏛️ Pillar Analysis",
+    "🗺️ Geographic Analysis",
+    "📈 Trends & Progress",
+    "🏆 Rankings Explorer",
+    "💻 Policy Recommendations",
+    "💬 Chatbot Q&A",
+])
+
+with tab1:
+    render_global_overview(facts)
+with tab2:
+    render_country_profiles(facts, country_list)
+with tab3:
+    render_compare_countries(facts, country_list)
+with tab4:
+    render_pillar_analysis(facts, pillar_labels, pillar_label_to_full)
+with tab5:
+    render_geographic_analysis(facts, pillar_labels, pillar_label_to_full)
+with tab6:
+    render_trends_progress(facts, pillar_labels, pillar_label_to_full)
+with tab7:
+    render_rankings_explorer(facts)
+with tab8:
+    render_policy_recommendations(facts, country_list)
+with tab9:
+    render_chatbot()
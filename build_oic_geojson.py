@@ -0,0 +1,54 @@
+"""
+Cuts the OIC countries' boundaries out of a Natural Earth countries GeoJSON
+and writes them to data/oic_countries.geojson for the ADEI map.
+
+Download the source file once, then run:
+    python build_oic_geojson.py ne_50m_admin_0_countries.geojson
+
+Source: https://raw.githubusercontent.com/nvkelso/natural-earth-vector/v5.1.2/geojson/ne_50m_admin_0_countries.geojson
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from profile_generator import get_iso_alpha
+
+DB_PATH = Path("data/processed/digital_economy.db")
+OUT_PATH = Path("data/oic_countries.geojson")
+
+if len(sys.argv) != 2:
+    sys.exit(f"usage: python {Path(__file__).name} <natural-earth-countries.geojson>")
+
+# Same name -> ISO alpha-3 mapping the app uses for the map data
+conn = sqlite3.connect(DB_PATH)
+names = [name for (name,) in conn.execute("SELECT name FROM countries")]
+conn.close()
+iso_codes = {code for code in map(get_iso_alpha, names) if code}
+
+with open(sys.argv[1], encoding="utf-8") as f:
+    world = json.load(f)
+
+boundaries = {}
+for feature in world["features"]:
+    props = feature["properties"]
+    # ISO_A3 is "-99" for a few disputed/overseas entries; ADM0_A3 covers those
+    iso = props.get("ISO_A3") if props.get("ISO_A3") in iso_codes else props.get("ADM0_A3")
+    if iso in iso_codes:
+        boundaries.setdefault(iso, feature["geometry"])
+
+with open(OUT_PATH, "w", encoding="utf-8") as f:
+    json.dump({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": geometry, "properties": {"iso_a3": iso}}
+            for iso, geometry in sorted(boundaries.items())
+        ],
+    }, f, separators=(",", ":"))
+
+print(f"Boundaries written → {OUT_PATH}")
+print(f"Countries matched: {len(boundaries)} of {len(iso_codes)}")
+missing = sorted(iso_codes - boundaries.keys())
+if missing:
+    print(f"No boundary found for: {', '.join(missing)}")
@@ -3,8 +3,9 @@ Converts '27 Jan_data ADEI.xlsx' into the oic_digital_economy_index.json format
 and rebuilds the SQLite database.
 """
 
+import numpy as np
 import pandas as pd
-import json
+import orjson
 import sqlite3
 import math
 from pathlib import Path
@@ -165,7 +166,25 @@ def normalise_col_header(h):
 # ─────────────────────────────────────────────
 
 EXCEL_PATH = Path("27 Jan_data ADEI.xlsx")
-df = pd.read_excel(EXCEL_PATH, sheet_name="Sheet1", header=0)
+
+# Only these columns are used below; anything else in the sheet is skipped at
+# parse time. Headers are matched after normalising (1.1 → '1.1'), and missing
+# ones are tolerated, as reindex() fills them in later
+NEEDED_COLS = {"Country", "ADEI", "Rank", "Year"} | {
+    code
+    for info in PILLAR_STRUCTURE.values()
+    for code in [info["total_col"]] + [c for c, _ in info["sub_cols"]]
+}
+
+# calamine (Rust) streams the sheet instead of building openpyxl's full XML
+# DOM, which was most of this script's runtime
+df = pd.read_excel(
+    EXCEL_PATH,
+    sheet_name="Sheet1",
+    header=0,
+    engine="calamine",
+    usecols=lambda h: normalise_col_header(h) in NEEDED_COLS,
+)
 
 # Normalise column names
 df.columns = [normalise_col_header(c) for c in df.columns]
@@ -177,31 +196,53 @@ if "Year" in df.columns:
 print(f"Loaded {len(df)} countries from Excel.")
 
 # ─────────────────────────────────────────────
-# 4.  Compute pillar ranks for dimension_summary
+# 4.  Clean scores and compute pillar ranks
 # ─────────────────────────────────────────────
 
 pillar_total_cols = [info["total_col"] for info in PILLAR_STRUCTURE.values()]
-for col in pillar_total_cols:
-    rank_col = f"_rank_{col}"
-    df[rank_col] = df[col].rank(ascending=False, method="min").astype(int)
+
+# Every score column as one float64 matrix, cleaned in a single pass the way
+# safe_float cleaned each cell: non-numeric/NaN -> 0.0, missing column -> 0
+score_codes = pillar_total_cols + [
+    code for info in PILLAR_STRUCTURE.values() for code, _ in info["sub_cols"]
+]
+code_idx = {code: i for i, code in enumerate(score_codes)}
+scores = (
+    df.reindex(columns=score_codes, fill_value=0)
+    .apply(pd.to_numeric, errors="coerce")
+    .fillna(0.0)
+    .to_numpy(dtype=np.float64)
+)
+# rint rounds half-to-even exactly like round(); the 2-dp rounding below stays
+# on round(), since np.round(x, 2) differs from it on values like 4.325
+pillar_values = np.rint(scores[:, :len(pillar_total_cols)]).astype(int).tolist()
+score_rows = scores.tolist()
+
+# Descending "min" ranks for all pillars at once: 1 + the number of countries
+# scoring strictly higher, which is what rank(ascending=False, method="min")
+# gave column by column
+totals = scores[:, :len(pillar_total_cols)]
+pillar_ranks = ((totals[None, :, :] > totals[:, None, :]).sum(axis=1) + 1).tolist()
 
 # ─────────────────────────────────────────────
 # 5.  Build JSON list
 # ─────────────────────────────────────────────
 
 all_countries = []
+pillar_items = list(PILLAR_STRUCTURE.items())
 
-for _, row in df.iterrows():
+# Plain dicts: no per-row Series construction, and .get() works as before
+for i, row in enumerate(df.to_dict(orient="records")):
+    row_scores = score_rows[i]
     country_name = str(row["Country"]).strip()
     adei_score = int(round(safe_float(row.get("ADEI", 0))))
     adei_rank  = int(row.get("Rank", 0)) if pd.notna(row.get("Rank", None)) else 0
 
     # --- dimension_summary ---
     dimension_summary = []
-    for pillar_name, info in PILLAR_STRUCTURE.items():
-        tcol = info["total_col"]
-        val  = int(round(safe_float(row.get(tcol, 0))))
-        rank = int(df.loc[df["Country"] == row["Country"], f"_rank_{tcol}"].iloc[0])
+    for p, (pillar_name, info) in enumerate(pillar_items):
+        val  = pillar_values[i][p]
+        rank = pillar_ranks[i][p]
         dimension_summary.append({
             "dimension": info["dimension"],
             "pillar":    info["pillar_short"],
@@ -211,12 +252,12 @@ for _, row in df.iterrows():
 
     # --- detailed_pillars ---
     detailed_pillars = []
-    for pillar_name, info in PILLAR_STRUCTURE.items():
+    for pillar_name, info in pillar_items:
         tcol  = info["total_col"]
-        total = round(safe_float(row.get(tcol, 0)), 2)
+        total = round(row_scores[code_idx[tcol]], 2)
         sub_pillars = []
         for code, name in info["sub_cols"]:
-            score = round(safe_float(row.get(code, 0)), 2)
+            score = round(row_scores[code_idx[code]], 2)
             sub_pillars.append({"name": name, "score": score})
         detailed_pillars.append({
             "pillar_name":        pillar_name,
@@ -244,10 +285,12 @@ JSON_PATHS = [
     Path("data/processed/oic_digital_economy_index.json"),
 ]
 
+# Serialise once with orjson (compiled, UTF-8 bytes like ensure_ascii=False)
+# and write the same payload to both locations
+payload = orjson.dumps(all_countries, option=orjson.OPT_INDENT_2)
 for p in JSON_PATHS:
     p.parent.mkdir(parents=True, exist_ok=True)
-    with open(p, "w", encoding="utf-8") as f:
-        json.dump(all_countries, f, ensure_ascii=False, indent=4)
+    p.write_bytes(payload)
     print(f"JSON written → {p}")
 
 # ─────────────────────────────────────────────
@@ -265,6 +308,14 @@ if DB_PATH.exists():
 conn = sqlite3.connect(str(DB_PATH))
 cur  = conn.cursor()
 
+# The file is rebuilt from scratch on every run, so durability during the
+# load doesn't matter: skip fsyncs and keep the journal in memory
+cur.executescript("""
+PRAGMA synchronous=OFF;
+PRAGMA journal_mode=MEMORY;
+PRAGMA temp_store=MEMORY;
+""")
+
 # Create tables
 cur.executescript("""
 CREATE TABLE IF NOT EXISTS countries (
@@ -301,30 +352,75 @@ CREATE TABLE IF NOT EXISTS sub_pillars (
 );
 """)
 
-for country in all_countries:
-    cur.execute(
-        "INSERT OR IGNORE INTO countries (name, adei_score, adei_rank) VALUES (?,?,?)",
-        (country["country_name"], country["overall_adei_score"], country["overall_adei_rank"]),
+# IDs are assigned here rather than read back from lastrowid, so each table
+# can be bulk-loaded from a DataFrame with multi-row INSERT ... VALUES. The
+# row tuples are built by comprehensions rather than per-row append() calls
+countries_rows = [
+    (country_id, country["country_name"], country["overall_adei_score"], country["overall_adei_rank"])
+    for country_id, country in enumerate(all_countries, start=1)
+]
+dim_rows = [
+    (country_id, ds["dimension"], ds["pillar"], ds["value"], ds["rank"])
+    for country_id, country in enumerate(all_countries, start=1)
+    for ds in country["dimension_summary"]
+]
+# Pillar ids run on across countries, so number the flattened pillar list
+country_pillars = [
+    (country_id, pillar)
+    for country_id, country in enumerate(all_countries, start=1)
+    for pillar in country["detailed_pillars"]
+]
+pillar_rows = [
+    (pillar_id, country_id, pillar["pillar_name"], pillar["total_pillar_score"])
+    for pillar_id, (country_id, pillar) in enumerate(country_pillars, start=1)
+]
+sub_rows = [
+    (pillar_id, sp["name"], sp["score"])
+    for pillar_id, (_, pillar) in enumerate(country_pillars, start=1)
+    for sp in pillar["sub_pillars"]
+]
+
+countries_df = pd.DataFrame(countries_rows, columns=["id", "name", "adei_score", "adei_rank"])
+dim_df = pd.DataFrame(dim_rows, columns=["country_id", "dimension", "pillar", "value", "rank"])
+pillars_df = pd.DataFrame(pillar_rows, columns=["id", "country_id", "pillar_name", "total_pillar_score"])
+sub_df = pd.DataFrame(sub_rows, columns=["pillar_id", "name", "score"])
+
+# Older SQLite builds cap a statement at 999 bound parameters, so size each
+# multi-row INSERT to stay under that for the table's column count
+SQLITE_MAX_VARIABLES = 999
+
+# countries.name is UNIQUE; keep the first row per name as INSERT OR IGNORE did
+for table, frame in (
+    ("countries", countries_df.drop_duplicates(subset="name", keep="first")),
+    ("dimension_summaries", dim_df),
+    ("pillars", pillars_df),
+    ("sub_pillars", sub_df),
+):
+    frame.to_sql(
+        table, conn, if_exists="append", index=False,
+        method="multi", chunksize=SQLITE_MAX_VARIABLES // len(frame.columns),
     )
-    country_id = cur.lastrowid
-
-    for ds in country["dimension_summary"]:
-        cur.execute(
-            "INSERT INTO dimension_summaries (country_id, dimension, pillar, value, rank) VALUES (?,?,?,?,?)",
-            (country_id, ds["dimension"], ds["pillar"], ds["value"], ds["rank"]),
-        )
-
-    for pillar in country["detailed_pillars"]:
-        cur.execute(
-            "INSERT INTO pillars (country_id, pillar_name, total_pillar_score) VALUES (?,?,?)",
-            (country_id, pillar["pillar_name"], pillar["total_pillar_score"]),
-        )
-        pillar_id = cur.lastrowid
-        for sp in pillar["sub_pillars"]:
-            cur.execute(
-                "INSERT INTO sub_pillars (pillar_id, name, score) VALUES (?,?,?)",
-                (pillar_id, sp["name"], sp["score"]),
-            )
+
+# Indexes for the app's lookups (countries.name is covered by UNIQUE); built
+# after the inserts so loading doesn't maintain them row by row
+cur.executescript("""
+CREATE INDEX IF NOT EXISTS idx_countries_adei_rank ON countries (adei_rank);
+CREATE INDEX IF NOT EXISTS idx_dimension_summaries_country ON dimension_summaries (country_id);
+CREATE INDEX IF NOT EXISTS idx_pillars_country ON pillars (country_id, pillar_name);
+CREATE INDEX IF NOT EXISTS idx_pillars_name ON pillars (pillar_name, total_pillar_score);
+CREATE INDEX IF NOT EXISTS idx_sub_pillars_pillar ON sub_pillars (pillar_id);
+CREATE INDEX IF NOT EXISTS idx_sub_pillars_name ON sub_pillars (name);
+ANALYZE;
+""")
+
+# Precomputed aggregates for the overview tab; the data only changes when this
+# script runs, so the app reads these back instead of grouping on every load
+cur.executescript("""
+DROP TABLE IF EXISTS mv_avg_pillar;
+CREATE TABLE mv_avg_pillar AS
+    SELECT pillar_name, AVG(total_pillar_score) AS average_score
+    FROM pillars GROUP BY pillar_name ORDER BY pillar_name;
+""")
 
 conn.commit()
 conn.close()
@@ -2,6 +2,9 @@
 
 import os
 import json
+import ahocorasick
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.vectorstores import FAISS
@@ -9,9 +12,35 @@ from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 # Import your core functions and models
-from src.core.extractor import create_rag_chain_from_documents
+from src.core.extractor import create_rag_chain_from_retriever
 from src.config import COUNTRIES, RAW_DATA_PATH, PROCESSED_DATA_PATH
 
+# Each extraction mostly waits on the embeddings and Gemini APIs, so countries
+# run concurrently; the cap keeps us within the API rate limits.
+EXTRACTION_WORKERS = 8
+
+def extract_country(country, start, end, vector_store):
+    """Extracts one country's data from its section, chunks [start, end), of the shared index (None on failure)."""
+    # Every chunk is fetched and ranked, then filtered down to the section, so
+    # the context holds all of the section's chunks just like a per-country index.
+    # A dict filter (list value = "one of") works on every langchain-community
+    # release; callable filters only arrived in later ones
+    retriever = vector_store.as_retriever(search_kwargs={
+        "k": end - start,
+        "fetch_k": vector_store.index.ntotal,
+        "filter": {"chunk_id": list(range(start, end))},
+    })
+    rag_chain = create_rag_chain_from_retriever(retriever)
+
+    try:
+        question = f"Extract the complete digital economy index data for {country} from the provided context."
+        structured_output = rag_chain.invoke(question)
+        print(f"Successfully extracted data for {country}.")
+        return structured_output.dict()
+    except Exception as e:
+        print(f"Could not extract data for {country}. Error: {e}")
+        return None
+
 def run_extraction():
     """Main function to run the data extraction process."""
     load_dotenv()
@@ -25,8 +54,26 @@ def run_extraction():
     # Split the document into pages (or smaller chunks if needed)
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
     all_chunks = text_splitter.split_documents(all_docs)
+    # Each chunk's position lets the shared index be filtered to a country's section
+    for j, chunk in enumerate(all_chunks):
+        chunk.metadata["chunk_id"] = j
 
-    all_countries_data = []
+    # Record which chunks mention each name, so a country's section is found
+    # with a lookup and a bisect. One Aho-Corasick automaton matches every name
+    # in a single pass over each chunk instead of one substring scan per name;
+    # it reports overlapping matches too ("niger" inside "nigeria"), like `in`
+    names = {name.lower() for name in COUNTRIES} | {"end of document"}
+    automaton = ahocorasick.Automaton()
+    for name in names:
+        automaton.add_word(name, name)
+    automaton.make_automaton()
+
+    mentions = {name: [] for name in names}
+    for j, chunk in enumerate(all_chunks):
+        for name in {name for _, name in automaton.iter(chunk.page_content.lower())}:
+            mentions[name].append(j)
+
+    country_sections = []
 
     for i, country in enumerate(COUNTRIES):
         print(f"Processing {country}...")
@@ -34,34 +81,38 @@ def run_extraction():
         # --- Isolate Chunks for the Current Country ---
         next_country = COUNTRIES[i + 1] if i + 1 < len(COUNTRIES) else "End of Document"
         
-        country_chunks = []
-        in_country_section = False
-        for chunk in all_chunks:
-            if country.lower() in chunk.page_content.lower():
-                in_country_section = True
-            if next_country.lower() in chunk.page_content.lower() and in_country_section:
-                # We've reached the start of the next country's section
-                if country.lower() not in next_country.lower(): # Handles cases like "Guinea" vs "Guinea-Bissau"
-                    break
-            if in_country_section:
-                country_chunks.append(chunk)
-
-        if not country_chunks:
+        start = end = 0
+        country_hits = mentions[country.lower()]
+        if country_hits:
+            start = country_hits[0]
+            end = len(all_chunks)
+            # The section ends where the next country's section starts
+            if country.lower() not in next_country.lower(): # Handles cases like "Guinea" vs "Guinea-Bissau"
+                next_hits = mentions[next_country.lower()]
+                k = bisect_left(next_hits, start)
+                if k < len(next_hits):
+                    end = next_hits[k]
+
+        if end == start:
             print(f"Warning: No content found for {country}. Skipping.")
             continue
 
-        print(f"Found {len(country_chunks)} chunks for {country}.")
+        print(f"Found {end - start} chunks for {country}.")
+        country_sections.append((country, start, end))
 
-        # --- Create a RAG chain specifically for these chunks ---
-        rag_chain = create_rag_chain_from_documents(country_chunks)
-        
-        try:
-            question = f"Extract the complete digital economy index data for {country} from the provided context."
-            structured_output = rag_chain.invoke(question)
-            all_countries_data.append(structured_output.dict())
-            print(f"Successfully extracted data for {country}.")
-        except Exception as e:
-            print(f"Could not extract data for {country}. Error: {e}")
+    # --- Embed the whole document once into a single shared index ---
+    # Each country's retriever filters it by chunk_id, so chunks are embedded
+    # once instead of once per country section they fall in
+    all_countries_data = []
+    if country_sections:
+        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=os.getenv("GOOGLE_API_KEY"))
+        vector_store = FAISS.from_documents(all_chunks, embeddings)
+
+        # --- Extract the countries concurrently ---
+        # pool.map yields results in COUNTRIES order, whatever order they finish in
+        with ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS) as pool:
+            results = pool.map(lambda section: extract_country(*section, vector_store), country_sections)
+            all_countries_data = [data for data in results if data is not None]
 
     # Save the final data
     with open(PROCESSED_DATA_PATH, 'w', encoding='utf-8') as f:
@@ -3,10 +3,18 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from sqlalchemy import create_engine, event
+
 # LangChain imports for SQL agent
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
 from langchain_openai import ChatOpenAI # Or use GoogleGenerativeAI
+
+from agent_logic import (
+    AGENT_MAX_ITERATIONS,
+    AGENT_MAX_EXECUTION_TIME,
+    AGENT_PARSING_ERROR_MESSAGE,
+)
 # from src.core.config import COUNTRIES, RAW_DATA_PATH, PROCESSED_DATA_PATH, DB_FILE_PATH
 DB_FILE_PATH = "/Users/mac/Documents/My_ML_Project/Customer_Review/data/processed/digital_economy.db"
 
@@ -24,6 +32,10 @@ st.write("Ask questions in natural language about the digital economy data of 57
 # Define the path to the database
 DB_PATH = DB_FILE_PATH
 
+# The engine, LLM and agent are cached for the whole process, so a rerun
+# (every chat submit) reuses them instead of reconnecting, re-reading the
+# schema and rebuilding the agent.
+@st.cache_resource
 def get_db_engine():
     """Initializes and returns the SQLDatabase engine."""
     from pathlib import Path
@@ -31,12 +43,27 @@ def get_db_engine():
         st.error(f"Database not found at {DB_PATH}. Please run the data loading script first.")
         st.stop()
     
-    # Use f-string for cross-platform compatibility
-    return SQLDatabase.from_uri(f"sqlite:///{DB_PATH}")
+    # Read-only: the agent only queries, and the loader scripts rebuild the file
+    engine = create_engine(
+        f"sqlite:///file:{DB_PATH}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(engine, "connect", set_read_pragmas)
+    return SQLDatabase(engine)
+
+def set_read_pragmas(dbapi_connection, connection_record):
+    """Tunes each pooled connection for reads: memory-mapped pages and a warm page cache."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA mmap_size=268435456;")
+    cursor.execute("PRAGMA cache_size=-65536;")
+    cursor.execute("PRAGMA temp_store=MEMORY;")
+    cursor.execute("PRAGMA query_only=1;")
+    cursor.close()
 
 # --- LLM and Agent Initialization ---
-def get_sql_agent(db_engine):
-    """Initializes and returns the LangChain SQL Agent."""
+@st.cache_resource
+def get_llm():
+    """Initializes and returns the Gemini LLM."""
     load_dotenv()
     
     # For Google Gemini:
@@ -46,25 +73,44 @@ def get_sql_agent(db_engine):
         st.error("GOOGLE_API_KEY not found. Please add it to your .env file.")
         st.stop()
         
-    llm = GoogleGenerativeAI(
-        model="gemini-1.5-pro-latest",
+    return GoogleGenerativeAI(
+        model="gemini-2.5-flash",
         google_api_key=api_key,
         temperature=0.1,
         # max_output_tokens=8192 # This is often not needed unless you see truncated responses
     )
 
+@st.cache_resource
+def get_sql_agent(_db_engine):
+    """Initializes and returns the LangChain SQL Agent."""
+    llm = get_llm()
+
     # Create the SQL agent. This agent is aware of the database schema and can write SQL queries.
     agent_executor = create_sql_agent(
         llm=llm,
-        db=db_engine,
+        db=_db_engine,
         # --- THIS IS THE FIX ---
         # Use a generic agent type compatible with Google's models.
         agent_type="zero-shot-react-description", 
-        verbose=True, 
-        handle_parsing_errors=True,
+        verbose=os.getenv("DEBUG_AGENT") == "1",
+        max_iterations=AGENT_MAX_ITERATIONS,
+        max_execution_time=AGENT_MAX_EXECUTION_TIME,
+        early_stopping_method="force", # Stop with a fixed message instead of another LLM call
+        agent_executor_kwargs={
+            "return_intermediate_steps": False,
+            "handle_parsing_errors": AGENT_PARSING_ERROR_MESSAGE,
+        },
     )
     return agent_executor
 
+def stream_agent_answer(agent, prompt, status):
+    """Yields the agent's final answer, logging each SQL tool call to `status` as it runs."""
+    for chunk in agent.stream({"input": prompt}):
+        for action in chunk.get("actions", []):
+            status.write(f"`{action.tool}`: {action.tool_input}")
+        if "output" in chunk:
+            yield chunk["output"]
+
 # --- Main Application Logic ---
 db = get_db_engine()
 agent = get_sql_agent(db)
@@ -96,17 +142,17 @@ if prompt := st.chat_input("Ask a question about the digital economy index..."):
     # Add user message to chat history
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    with st.spinner("Thinking..."):
+    # Display assistant response in chat message container, streaming the
+    # agent's steps as they happen instead of blocking on the whole run
+    with st.chat_message("assistant"):
+        status = st.status("Thinking...")
         try:
             # The agent will convert the prompt to SQL, execute it, and return the answer
-            response = agent.invoke({"input": prompt})
-            response_content = response["output"]
+            response_content = st.write_stream(stream_agent_answer(agent, prompt, status))
+            status.update(label="Done", state="complete")
         except Exception as e:
             response_content = f"Sorry, I encountered an error: {e}"
-
-    # Display assistant response in chat message container
-    with st.chat_message("assistant"):
-        st.markdown(response_content)
+            status.update(label="Failed", state="error")
+            st.markdown(response_content)
     # Add assistant response to chat history
     st.session_state.messages.append({"role": "assistant", "content": response_content})
-
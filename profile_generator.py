@@ -1,48 +1,151 @@
 import sqlite3
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import pycountry # <-- Import the new library
-def get_country_list(db_connection):
-    """Fetches a sorted list of all country names from the database."""
-    query = "SELECT name FROM countries ORDER BY name ASC;"
-    df = pd.read_sql_query(query, db_connection)
-    return df['name'].tolist()
-
-def get_country_profile_data(country_name: str, db_connection):
-    """
-    Queries the database for all data related to a specific country.
+
+
+# Names in the dataset that pycountry doesn't know verbatim
+ISO_ALPHA_OVERRIDES = {
+    "Iran, Islamic Rep.": "IRN",
+    "Brunei Darussalam": "BRN",
+    "Cote d'Ivoire": "CIV",
+    "Syrian Arab Republic": "SYR",
+    "Kyrgyz Republic": "KGZ",
+    "Palestine": "PSE",
+    "Gambia, The": "GMB",
+    "Turkey": "TUR",
+}
+
+
+# pycountry loads its whole ISO database on import, so it is only imported
+# (and the name table built) the first time a map or geo view needs a code
+@lru_cache(maxsize=None)
+def get_iso_alpha_by_name():
+    """Returns pycountry's exact names (name, common and official) mapped to ISO alpha-3 codes."""
+    import pycountry
+    iso_alpha_by_name = {}
+    for country in pycountry.countries:
+        for attr in ("name", "common_name", "official_name"):
+            if hasattr(country, attr):
+                iso_alpha_by_name.setdefault(getattr(country, attr), country.alpha_3)
+    return iso_alpha_by_name
+
+
+@lru_cache(maxsize=None)
+def get_iso_alpha(country_name: str):
+    """Returns the ISO alpha-3 code for a country name, or None if unknown."""
+    code = ISO_ALPHA_OVERRIDES.get(country_name) or get_iso_alpha_by_name().get(country_name)
+    if code:
+        return code
+    # Fuzzy search scans every pycountry record, so it's only the last resort
+    import pycountry
+    try:
+        return pycountry.countries.search_fuzzy(country_name)[0].alpha_3
+    except LookupError:
+        return None
+
+
+# Full pillar name -> display label, in pillar order. There are only nine
+# pillars, so labels are a dict lookup instead of a regex over every row.
+PILLAR_SHORT = {
+    "First Pillar: Institutions": "Institutions",
+    "Second Pillar: Infrastructure": "Infrastructure",
+    "Third Pillar: Workforce": "Workforce",
+    "Fourth Pillar: E-Government": "E-Government",
+    "Fifth Pillar: Innovation": "Innovation",
+    "Sixth Pillar: Future Technologies": "Future Technologies",
+    "Seventh Pillar: Market Development and Sophistication": "Market Development and Sophistication",
+    "Eighth Pillar: Financial Market Development": "Financial Market Development",
+    "Ninth Pillar: Sustainable Development Goals": "Sustainable Development Goals",
+}
+
+
+def shorten_pillar_names(names: pd.Series) -> pd.Series:
+    """Maps full pillar names to their labels; unknown names fall back to stripping the prefix."""
+    short = names.map(PILLAR_SHORT)
+    missing = short.isna()
+    if missing.any():
+        short[missing] = names[missing].str.replace(r'^\w+\sPillar:\s', '', regex=True)
+    return short.astype(names.dtype)
+
+
+def query_frame(db_connection, sql: str, params=None):
+    """Runs a query and builds the DataFrame straight from the cursor rows."""
+    cursor = db_connection.execute(sql, params or ())
+    columns = [column[0] for column in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+
+def load_facts(db_connection):
     """
-    # Query for main ADEI score and rank
-    country_query = "SELECT adei_score, adei_rank FROM countries WHERE name = ?;"
-    main_stats = pd.read_sql_query(country_query, db_connection, params=(country_name,))
+    Loads the whole dataset into memory once. With 57 countries it is well under
+    1 MiB, so every view below is served as a pandas filter or groupby over
+    these frames instead of its own SQL query.
 
-    # Query for the 9 main pillar scores for the radar chart
-    pillars_query = """
-    SELECT p.pillar_name, p.total_pillar_score
+    Returns:
+        A dict of DataFrames:
+        - "countries":   one row per country (name, adei_score, adei_rank)
+        - "pillars":     one row per country × pillar, joined with country stats
+        - "sub_pillars": one row per country × indicator, joined with pillar/country
+        - "avg_pillar":  per-pillar averages precomputed by the loader
+        The pillar frames also carry "pillar_short" ("First Pillar: Institutions"
+        -> "Institutions"), stripped here once rather than in every view.
+    """
+    countries = query_frame(
+        db_connection, "SELECT id, name, adei_score, adei_rank FROM countries ORDER BY id;")
+    pillars = query_frame(db_connection, """
+    SELECT p.id AS pillar_id, c.name, c.adei_score, c.adei_rank,
+           p.pillar_name, p.total_pillar_score
     FROM pillars p
     JOIN countries c ON p.country_id = c.id
-    WHERE c.name = ?;
-    """
-    pillars_df = pd.read_sql_query(pillars_query, db_connection, params=(country_name,))
-    
-    # Clean up pillar names for better display
-    pillars_df['pillar_name'] = pillars_df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-
-
-    # Query for all sub-pillar scores
-    sub_pillars_query = """
-    SELECT p.pillar_name, sp.name AS indicator, sp.score
+    ORDER BY p.id;
+    """)
+    sub_pillars = query_frame(db_connection, """
+    SELECT sp.id AS sub_pillar_id, p.id AS pillar_id, c.name, c.adei_rank,
+           p.pillar_name, sp.name AS indicator, sp.score
     FROM sub_pillars sp
     JOIN pillars p ON sp.pillar_id = p.id
     JOIN countries c ON p.country_id = c.id
-    WHERE c.name = ?
     ORDER BY p.id, sp.id;
+    """)
+    facts = {"countries": countries, "pillars": pillars, "sub_pillars": sub_pillars}
+    facts["avg_pillar"] = query_frame(db_connection, "SELECT * FROM mv_avg_pillar;")
+    # Text columns (names, pillars, indicators) are the groupby and filter keys
+    # below; Arrow-backed strings keep them compact in the resident cache.
+    for frame in facts.values():
+        text_columns = frame.select_dtypes(include="object").columns
+        frame[text_columns] = frame[text_columns].astype("string[pyarrow]")
+    for key in ("pillars", "sub_pillars", "avg_pillar"):
+        facts[key]['pillar_short'] = shorten_pillar_names(facts[key]['pillar_name'])
+    return facts
+
+
+def get_country_list(facts: dict):
+    """Returns a sorted list of all country names."""
+    return sorted(facts["countries"]['name'].tolist())
+
+def get_country_profile_data(country_name: str, facts: dict):
     """
-    sub_pillars_df = pd.read_sql_query(sub_pillars_query, db_connection, params=(country_name,))
-    
-    # Clean up pillar names for grouping
-    sub_pillars_df['pillar_name'] = sub_pillars_df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-
+    Returns all data related to a specific country from the in-memory facts.
+    """
+    # Main ADEI score and rank: a single row, so a plain dict rather than a frame
+    countries = facts["countries"]
+    main_stats = countries.loc[
+        countries['name'] == country_name, ['adei_score', 'adei_rank']
+    ].to_dict('records')[0]
+
+    # The 9 main pillar scores for the radar chart
+    pillars = facts["pillars"]
+    pillars_df = pillars.loc[
+        pillars['name'] == country_name, ['pillar_short', 'total_pillar_score']
+    ].rename(columns={'pillar_short': 'pillar_name'}).reset_index(drop=True)
+
+    # All sub-pillar scores (facts are already ordered by pillar, then indicator)
+    sub_pillars = facts["sub_pillars"]
+    sub_pillars_df = sub_pillars.loc[
+        sub_pillars['name'] == country_name, ['pillar_short', 'indicator', 'score']
+    ].rename(columns={'pillar_short': 'pillar_name'}).reset_index(drop=True)
 
     return {
         "main_stats": main_stats,
@@ -72,13 +175,13 @@ def create_radar_chart(df: pd.DataFrame):
     )
     return fig
 
-def get_comparison_data(country_names: list, db_connection):
+def get_comparison_data(country_names: list, facts: dict):
     """
-    Queries the database for data needed to compare multiple countries.
+    Returns the data needed to compare multiple countries.
     
     Args:
         country_names (list): A list of country names to compare.
-        db_connection: An active sqlite3 connection object.
+        facts (dict): The in-memory dataset from load_facts().
         
     Returns:
         A tuple of two pandas DataFrames: (main_stats_df, pillars_df).
@@ -87,84 +190,74 @@ def get_comparison_data(country_names: list, db_connection):
         # Return empty DataFrames if no countries are selected
         return pd.DataFrame(), pd.DataFrame()
 
-    # Create a string of placeholders for the SQL IN clause (e.g., "?, ?, ?")
-    placeholders = ', '.join(['?'] * len(country_names))
+    # Main ADEI scores and ranks for the selected countries
+    countries = facts["countries"]
+    main_stats_df = (
+        countries.loc[countries['name'].isin(country_names), ['name', 'adei_score', 'adei_rank']]
+        .sort_values('adei_rank', kind='stable')
+        .reset_index(drop=True)
+    )
 
-    # Query for main ADEI scores and ranks for the selected countries
-    main_stats_query = f"""
-    SELECT name, adei_score, adei_rank
-    FROM countries
-    WHERE name IN ({placeholders})
-    ORDER BY adei_rank ASC;
-    """
-    main_stats_df = pd.read_sql_query(main_stats_query, db_connection, params=country_names)
-
-    # Query for the 9 main pillar scores for the selected countries
-    pillars_query = f"""
-    SELECT
-        c.name,
-        p.pillar_name,
-        p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id
-    WHERE c.name IN ({placeholders});
-    """
-    pillars_df = pd.read_sql_query(pillars_query, db_connection, params=country_names)
-    
-    # Clean up pillar names for better chart labels (e.g., "First Pillar: Institutions" -> "Institutions")
-    pillars_df['pillar_name'] = pillars_df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
+    # The 9 main pillar scores for the selected countries
+    pillars = facts["pillars"]
+    pillars_df = (
+        pillars.loc[pillars['name'].isin(country_names), ['name', 'pillar_short', 'total_pillar_score']]
+        .rename(columns={'pillar_short': 'pillar_name'})
+        .sort_values('name', kind='stable')
+        .reset_index(drop=True)
+    )
 
     return main_stats_df, pillars_df
 
 
 
-def get_leaderboard_data(db_connection):
-    """Fetches top 10 and bottom 10 countries by ADEI rank."""
-    query = "SELECT name, adei_score, adei_rank FROM countries ORDER BY adei_rank ASC;"
-    df = pd.read_sql_query(query, db_connection)
-    top_10 = df.head(10)
-    bottom_10 = df.tail(10).sort_values(by="adei_rank", ascending=True)
+def get_leaderboard_data(facts: dict):
+    """Returns the top 10 and bottom 10 countries by ADEI rank."""
+    ranked = (
+        facts["countries"].sort_values('adei_rank', kind='stable')
+        [['name', 'adei_score', 'adei_rank']]
+        .reset_index(drop=True)
+    )
+    top_10 = ranked.head(10)
+    bottom_10 = ranked.tail(10).reset_index(drop=True)
     return top_10, bottom_10
 
-def get_average_pillar_scores(db_connection):
-    """Calculates the average score for each of the 9 pillars across all countries."""
-    query = "SELECT pillar_name, AVG(total_pillar_score) as average_score FROM pillars GROUP BY pillar_name;"
-    df = pd.read_sql_query(query, db_connection)
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
+def get_average_pillar_scores(facts: dict):
+    """Returns the average score for each of the 9 pillars across all countries (precomputed by the loader)."""
+    df = (
+        facts["avg_pillar"].sort_values('pillar_name', kind='stable')
+        [['pillar_short', 'average_score']]
+        .rename(columns={'pillar_short': 'pillar_name'})
+        .reset_index(drop=True)
+    )
     return df
 
-def get_pillar_rankings(pillar_name: str, db_connection):
+def get_pillar_rankings(pillar_name: str, facts: dict):
     """
     Returns all countries ranked by score for a specific pillar,
     plus all sub-pillar scores for that pillar across all countries.
     """
-    countries_query = """
-    SELECT c.name, c.adei_rank, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id
-    WHERE p.pillar_name = ?
-    ORDER BY p.total_pillar_score DESC;
-    """
-    countries_df = pd.read_sql_query(countries_query, db_connection, params=(pillar_name,))
+    pillars = facts["pillars"]
+    countries_df = (
+        pillars.loc[pillars['pillar_name'] == pillar_name, ['name', 'adei_rank', 'total_pillar_score']]
+        .sort_values('total_pillar_score', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
     countries_df.insert(0, 'pillar_rank', range(1, len(countries_df) + 1))
 
-    sub_pillars_query = """
-    SELECT c.name, sp.name AS indicator, sp.score
-    FROM sub_pillars sp
-    JOIN pillars p ON sp.pillar_id = p.id
-    JOIN countries c ON p.country_id = c.id
-    WHERE p.pillar_name = ?
-    ORDER BY c.adei_rank, sp.id;
-    """
-    sub_pillars_df = pd.read_sql_query(sub_pillars_query, db_connection, params=(pillar_name,))
+    sub_pillars = facts["sub_pillars"]
+    sub_pillars_df = (
+        sub_pillars[sub_pillars['pillar_name'] == pillar_name]
+        .sort_values(['adei_rank', 'sub_pillar_id'], kind='stable')
+        [['name', 'indicator', 'score']]
+        .reset_index(drop=True)
+    )
 
     return countries_df, sub_pillars_df
 
 
-def get_all_pillar_names(db_connection):
-    """Returns the ordered list of distinct pillar names from the database."""
-    query = "SELECT DISTINCT pillar_name FROM pillars ORDER BY pillar_name;"
-    df = pd.read_sql_query(query, db_connection)
+def get_all_pillar_names(facts: dict):
+    """Returns the ordered list of distinct pillar names."""
     # Sort by pillar number prefix (First, Second, …)
     order = ["First", "Second", "Third", "Fourth", "Fifth", "Sixth", "Seventh", "Eighth", "Ninth"]
     def sort_key(n):
@@ -172,70 +265,44 @@ def get_all_pillar_names(db_connection):
             if n.startswith(word):
                 return i
         return 99
-    names = sorted(df['pillar_name'].tolist(), key=sort_key)
+    names = sorted(sorted(facts["pillars"]['pillar_name'].unique()), key=sort_key)
     return names
 
 
-def get_geo_pillar_data(pillar_name: str, db_connection):
+def get_pillar_label_map(facts: dict):
+    """Returns {short label: full pillar name}, in pillar order, for selectboxes."""
+    pillars = facts["pillars"].drop_duplicates('pillar_name').set_index('pillar_name')['pillar_short']
+    return {pillars[name]: name for name in get_all_pillar_names(facts)}
+
+
+def get_geo_pillar_data(pillar_name: str, facts: dict):
     """
     Returns a dataframe with iso_alpha, country name, adei_score, adei_rank,
     and the score for the specified pillar (or overall ADEI if pillar_name is None).
     """
     if pillar_name is None:
-        query = "SELECT name, adei_score AS score, adei_rank FROM countries;"
-        df = pd.read_sql_query(query, db_connection)
+        df = (
+            facts["countries"][['name', 'adei_score', 'adei_rank']]
+            .rename(columns={'adei_score': 'score'})
+        )
     else:
-        query = """
-        SELECT c.name, p.total_pillar_score AS score, c.adei_score, c.adei_rank
-        FROM pillars p
-        JOIN countries c ON p.country_id = c.id
-        WHERE p.pillar_name = ?;
-        """
-        df = pd.read_sql_query(query, db_connection, params=(pillar_name,))
-
-    def get_iso_alpha(country_name):
-        special = {
-            "Iran, Islamic Rep.": "Iran",
-            "Brunei Darussalam": "Brunei",
-            "Cote d'Ivoire": "CIV",
-            "Syrian Arab Republic": "SYR",
-        }
-        if country_name in special:
-            val = special[country_name]
-            if len(val) == 3:
-                return val
-            country_name = val
-        try:
-            return pycountry.countries.search_fuzzy(country_name)[0].alpha_3
-        except LookupError:
-            return None
-
-    df['iso_alpha'] = df['name'].apply(get_iso_alpha)
+        pillars = facts["pillars"]
+        df = (
+            pillars.loc[pillars['pillar_name'] == pillar_name,
+                        ['name', 'total_pillar_score', 'adei_score', 'adei_rank']]
+            .rename(columns={'total_pillar_score': 'score'})
+            .reset_index(drop=True)
+        )
+
+    df = df.assign(iso_alpha=df['name'].map(get_iso_alpha))
     return df.dropna(subset=['iso_alpha'])
 
 
-def get_map_data(db_connection):
-    """Fetches country scores and adds ISO Alpha-3 codes for mapping."""
-    query = "SELECT name, adei_score FROM countries;"
-    df = pd.read_sql_query(query, db_connection)
-
-    def get_iso_alpha(country_name):
-        # Handle special cases where names might not match pycountry's database
-        if country_name == "Iran, Islamic Rep.":
-            country_name = "Iran"
-        if country_name == "Brunei Darussalam":
-            country_name = "Brunei"
-        if country_name == "Cote d'Ivoire":
-            return "CIV" # Direct mapping for names with apostrophes
-        if country_name == "Syrian Arab Republic":
-            return "SYR"
-            
-        try:
-            return pycountry.countries.search_fuzzy(country_name)[0].alpha_3
-        except LookupError:
-            return None # Return None if country is not found
-
-    df['iso_alpha'] = df['name'].apply(get_iso_alpha)
+def get_map_data(facts: dict):
+    """Returns country scores with ISO Alpha-3 codes for mapping."""
+    df = facts["countries"][['name', 'adei_score']].copy()
+
+    df['iso_alpha'] = df['name'].map(get_iso_alpha)
     return df.dropna(subset=['iso_alpha']) # Drop rows where no ISO code was found
 
 
@@ -259,89 +326,87 @@ COUNTRY_REGIONS = {
     "Europe & Americas": ["Albania", "Suriname", "Guyana"],
 }
 
-def get_country_region(country_name: str) -> str:
-    for region, countries in COUNTRY_REGIONS.items():
-        if country_name in countries:
-            return region
-    return "Other"
+# Reverse lookup so whole name columns can be mapped in one pass.
+REGION_BY_COUNTRY = {}
+for _region, _countries in COUNTRY_REGIONS.items():
+    for _country in _countries:
+        REGION_BY_COUNTRY.setdefault(_country, _region)
 
 
-def get_pillar_correlation_matrix(db_connection):
-    """Returns a correlation matrix DataFrame of pillar scores across all countries."""
-    query = """
-    SELECT c.name, p.pillar_name, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id;
-    """
-    df = pd.read_sql_query(query, db_connection)
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-    pivot = df.pivot_table(index='name', columns='pillar_name', values='total_pillar_score')
-    return pivot.corr().round(2)
+def get_country_region(country_name: str) -> str:
+    return REGION_BY_COUNTRY.get(country_name, "Other")
 
 
-def get_oic_aggregate_stats(db_connection):
+def get_pillar_correlation_matrix(facts: dict):
+    """Returns a correlation matrix DataFrame of pillar scores across all countries."""
+    df = facts["pillars"]
+    # Scatter the scores straight into a countries x pillars grid (pillars
+    # sorted, as pivot() ordered them) and correlate it with NumPy
+    _, row_idx = np.unique(df['name'].to_numpy(), return_inverse=True)
+    labels, col_idx = np.unique(df['pillar_short'].to_numpy(), return_inverse=True)
+    grid = np.full((row_idx.max() + 1, len(labels)), np.nan)
+    grid[row_idx, col_idx] = df['total_pillar_score'].to_numpy()
+    # Every country has all nine pillars; with a gap, fall back to pandas'
+    # pairwise-complete correlation
+    corr = np.corrcoef(grid, rowvar=False) if not np.isnan(grid).any() else pd.DataFrame(grid).corr().to_numpy()
+    index = pd.Index(labels, name='pillar_name')
+    return pd.DataFrame(corr, index=index, columns=index).round(2)
+
+
+def get_oic_aggregate_stats(facts: dict):
     """Returns per-pillar OIC aggregate statistics (mean, median, Q1, Q3)."""
-    query = """
-    SELECT p.pillar_name, p.total_pillar_score
-    FROM pillars p;
-    """
-    df = pd.read_sql_query(query, db_connection)
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-    stats = df.groupby('pillar_name')['total_pillar_score'].agg(
-        Mean='mean', Median='median',
-        Q1=lambda x: x.quantile(0.25),
-        Q3=lambda x: x.quantile(0.75),
-    ).round(1).reset_index()
-    order = ["Institutions", "Infrastructure", "Workforce", "E-Government",
-             "Innovation", "Future Technologies",
-             "Market Development and Sophistication",
-             "Financial Market Development", "Sustainable Development Goals"]
-    stats['_ord'] = stats['pillar_name'].apply(
-        lambda n: order.index(n) if n in order else 99)
+    df = facts["pillars"][['pillar_short', 'total_pillar_score']].rename(columns={'pillar_short': 'pillar_name'})
+    # Built-in groupby reductions throughout; the quantiles used to be lambdas
+    # that pandas called once per pillar from Python
+    scores = df.groupby('pillar_name')['total_pillar_score']
+    stats = pd.DataFrame({
+        'Mean': scores.mean(),
+        'Median': scores.median(),
+        'Q1': scores.quantile(0.25),
+        'Q3': scores.quantile(0.75),
+    }).round(1).reset_index()
+    order = list(PILLAR_SHORT.values())
+    stats['_ord'] = stats['pillar_name'].map({n: i for i, n in enumerate(order)}).fillna(99)
     return stats.sort_values('_ord').drop(columns='_ord').reset_index(drop=True)
 
 
-def get_country_strengths_weaknesses(country_name: str, db_connection, top_n: int = 5):
+def get_country_strengths_weaknesses(country_name: str, facts: dict, top_n: int = 5):
     """Returns top N (strengths) and bottom N (weaknesses) sub-pillar indicators."""
-    query = """
-    SELECT sp.name AS indicator, sp.score, p.pillar_name
-    FROM sub_pillars sp
-    JOIN pillars p ON sp.pillar_id = p.id
-    JOIN countries c ON p.country_id = c.id
-    WHERE c.name = ?
-    ORDER BY sp.score DESC;
-    """
-    df = pd.read_sql_query(query, db_connection, params=(country_name,))
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-    strengths = df.head(top_n).reset_index(drop=True)
-    weaknesses = df.tail(top_n).sort_values('score').reset_index(drop=True)
+    sub_pillars = facts["sub_pillars"]
+    df = (
+        sub_pillars.loc[sub_pillars['name'] == country_name, ['indicator', 'score', 'pillar_short']]
+        .rename(columns={'pillar_short': 'pillar_name'})
+        .reset_index(drop=True)
+    )
+    # Bounded selections instead of a full sort. On ties, strengths take the
+    # earliest indicators and weaknesses the latest, as head/tail of the sort did
+    strengths = df.nlargest(top_n, 'score', keep='first').reset_index(drop=True)
+    weaknesses = df.nsmallest(top_n, 'score', keep='last').reset_index(drop=True)
     return strengths, weaknesses
 
 
-def get_peer_region_data(country_name: str, db_connection):
+def get_peer_region_data(country_name: str, facts: dict):
     """Returns a comparison of the country against its regional peers (pillar scores)."""
     region = get_country_region(country_name)
     peers = COUNTRY_REGIONS.get(region, [country_name])
 
-    placeholders = ', '.join(['?'] * len(peers))
-    query = f"""
-    SELECT c.name, p.pillar_name, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id
-    WHERE c.name IN ({placeholders});
-    """
-    df = pd.read_sql_query(query, db_connection, params=peers)
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-    df['group'] = df['name'].apply(lambda n: country_name if n == country_name else f"{region} Avg")
-
-    # Build regional average rows
-    avg_df = df[df['name'] != country_name].groupby('pillar_name')['total_pillar_score'].mean().reset_index()
-    avg_df['name'] = f"{region} Average"
-    avg_df['group'] = f"{region} Avg"
-    avg_df.rename(columns={'total_pillar_score': 'total_pillar_score'}, inplace=True)
-
-    country_df = df[df['name'] == country_name][['name', 'pillar_name', 'total_pillar_score', 'group']]
-    combined = pd.concat([country_df, avg_df[['name', 'pillar_name', 'total_pillar_score', 'group']]], ignore_index=True)
+    pillars = facts["pillars"]
+    df = pillars.loc[
+        pillars['name'].isin(peers), ['name', 'pillar_short', 'total_pillar_score']
+    ].rename(columns={'pillar_short': 'pillar_name'})
+
+    # Relabel every other peer as the regional average, so a single groupby
+    # yields the country's own rows (a mean over one score) and the average
+    # rows. The country's rows are moved first so its pillar order leads.
+    is_country = df['name'] == country_name
+    df['name'] = df['name'].where(is_country, f"{region} Average")
+    combined = (
+        df.sort_values('name', key=lambda names: names != country_name, kind='stable')
+        .groupby(['name', 'pillar_name'], sort=False)['total_pillar_score']
+        .mean()
+        .reset_index()
+    )
+    combined['group'] = combined['name'].where(combined['name'] == country_name, f"{region} Avg")
     return combined, region
 
 
@@ -352,12 +417,13 @@ def create_multi_radar_chart(pillars_df: pd.DataFrame):
         "#636EFA", "#EF553B", "#00CC96", "#AB63FA",
         "#FFA15A", "#19D3F3", "#FF6692", "#B6E880",
     ]
-    country_names = pillars_df['name'].unique()
-    for i, country in enumerate(country_names):
-        subset = pillars_df[pillars_df['name'] == country]
+    # One groupby pass (in first-appearance order) instead of a mask per country
+    for i, (country, subset) in enumerate(pillars_df.groupby('name', sort=False)):
+        scores = subset['total_pillar_score'].tolist()
+        pillar_names = subset['pillar_name'].tolist()
         fig.add_trace(go.Scatterpolar(
-            r=subset['total_pillar_score'].tolist() + [subset['total_pillar_score'].iloc[0]],
-            theta=subset['pillar_name'].tolist() + [subset['pillar_name'].iloc[0]],
+            r=scores + scores[:1],
+            theta=pillar_names + pillar_names[:1],
             fill='toself',
             name=country,
             line_color=colors[i % len(colors)],
@@ -372,20 +438,16 @@ def create_multi_radar_chart(pillars_df: pd.DataFrame):
     return fig
 
 
-def get_regional_aggregation(db_connection):
+def get_regional_aggregation(facts: dict):
     """Returns average ADEI score and per-pillar averages grouped by sub-region."""
-    query = """
-    SELECT c.name, c.adei_score, p.pillar_name, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id;
-    """
-    df = pd.read_sql_query(query, db_connection)
-    df['region'] = df['name'].apply(get_country_region)
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-
-    # ADEI averages per region
-    adei_df = df.drop_duplicates(subset=['name'])[['name', 'adei_score', 'region']]
-    adei_avg = adei_df.groupby('region')['adei_score'].agg(
+    df = facts["pillars"][['name', 'adei_score', 'pillar_short', 'total_pillar_score']].rename(
+        columns={'pillar_short': 'pillar_name'})
+    df['region'] = df['name'].map(REGION_BY_COUNTRY).fillna("Other")
+
+    # ADEI averages per region, straight from the one-row-per-country frame
+    countries = facts["countries"]
+    region = countries['name'].map(REGION_BY_COUNTRY).fillna("Other").rename('region')
+    adei_avg = countries.groupby(region)['adei_score'].agg(
         avg_adei='mean', country_count='count').round(1).reset_index()
 
     # Pillar averages per region
@@ -394,17 +456,12 @@ def get_regional_aggregation(db_connection):
     return adei_avg, pillar_avg
 
 
-def get_rankings_explorer_data(db_connection):
+def get_rankings_explorer_data(facts: dict):
     """Returns a wide-format table: rows=countries, columns=ADEI + 9 pillar scores."""
-    query = """
-    SELECT c.name, c.adei_score, c.adei_rank, p.pillar_name, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id
-    ORDER BY c.adei_rank;
-    """
-    df = pd.read_sql_query(query, db_connection)
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
-    pivot = df.pivot_table(
+    df = facts["pillars"][['name', 'adei_score', 'adei_rank', 'pillar_short', 'total_pillar_score']].rename(
+        columns={'pillar_short': 'pillar_name'})
+    # One row per (country, pillar), so a plain reshape is enough
+    pivot = df.pivot(
         index=['name', 'adei_rank', 'adei_score'],
         columns='pillar_name',
         values='total_pillar_score',
@@ -412,35 +469,58 @@ def get_rankings_explorer_data(db_connection):
     pivot.columns.name = None
     pivot = pivot.rename(columns={'name': 'Country', 'adei_rank': 'Rank', 'adei_score': 'ADEI Score'})
     # Reorder pillar columns
-    pillar_order = ["Institutions", "Infrastructure", "Workforce", "E-Government",
-                    "Innovation", "Future Technologies",
-                    "Market Development and Sophistication",
-                    "Financial Market Development", "Sustainable Development Goals"]
+    pillar_order = list(PILLAR_SHORT.values())
     base_cols = ['Country', 'Rank', 'ADEI Score']
     ordered_cols = base_cols + [c for c in pillar_order if c in pivot.columns]
     return pivot[ordered_cols]
 
 
+def get_all_pillar_scores(facts: dict):
+    """Returns every country's score on every pillar, with short pillar names."""
+    return facts["pillars"][['name', 'adei_rank', 'pillar_short', 'total_pillar_score']].rename(
+        columns={'pillar_short': 'pillar_name'})
+
+
+def get_score_ladder(pillar_name, facts: dict):
+    """
+    Returns all countries ordered by score for one pillar, or by overall ADEI
+    score when pillar_name is None. Columns: name, score, rank.
+    """
+    if pillar_name is None:
+        return (
+            facts["countries"][['name', 'adei_score', 'adei_rank']]
+            .rename(columns={'adei_score': 'score', 'adei_rank': 'rank'})
+            .sort_values('rank', kind='stable')
+            .reset_index(drop=True)
+        )
+    pillars = facts["pillars"]
+    df = (
+        pillars.loc[pillars['pillar_name'] == pillar_name, ['name', 'total_pillar_score']]
+        .rename(columns={'total_pillar_score': 'score'})
+        .sort_values('score', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
+    # Same as SQL RANK(): ties share the lowest rank
+    df['rank'] = df['score'].rank(method='min', ascending=False).astype('int64')
+    return df
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # HTML-feature helpers (Gap Analysis, SWOT, Key Findings, Policy Recs)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def get_gap_analysis_data(country_name, db_connection):
+def get_gap_analysis_data(country_name, facts):
     """Returns country pillar scores vs Top-5 OIC average and overall OIC average per pillar."""
-    query = """
-    SELECT c.name, p.pillar_name, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id;
-    """
-    df = pd.read_sql_query(query, db_connection)
-    df['pillar_name'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
+    df = facts["pillars"][['name', 'pillar_short', 'total_pillar_score']].rename(
+        columns={'pillar_short': 'pillar_name'})
 
     oic_avg = df.groupby('pillar_name')['total_pillar_score'].mean().reset_index()
     oic_avg.columns = ['pillar_name', 'oic_avg']
 
     top5_avg = (
-        df.groupby('pillar_name')
-        .apply(lambda g: g.nlargest(5, 'total_pillar_score')['total_pillar_score'].mean())
+        df.sort_values('total_pillar_score', ascending=False)
+        .groupby('pillar_name').head(5)
+        .groupby('pillar_name')['total_pillar_score'].mean()
         .reset_index()
     )
     top5_avg.columns = ['pillar_name', 'top5_avg']
@@ -452,15 +532,9 @@ def get_gap_analysis_data(country_name, db_connection):
     return merged
 
 
-def generate_swot(country_name, db_connection):
+def generate_swot(country_name, facts):
     """Generates a dynamic SWOT analysis based on pillar scores vs OIC averages."""
-    query = """
-    SELECT c.name, p.pillar_name, p.total_pillar_score, c.adei_score, c.adei_rank
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id;
-    """
-    df = pd.read_sql_query(query, db_connection)
-    df['pillar_short'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
+    df = facts["pillars"][['name', 'pillar_short', 'total_pillar_score', 'adei_score', 'adei_rank']]
 
     oic_avg = df.groupby('pillar_short')['total_pillar_score'].mean()
     country_df = df[df['name'] == country_name].copy()
@@ -506,16 +580,14 @@ def generate_swot(country_name, db_connection):
     return swot
 
 
-def get_pillar_key_findings(pillar_full_name, db_connection):
+def get_pillar_key_findings(pillar_full_name, facts):
     """Returns top scorer, OIC average, and laggard for a given pillar."""
-    query = """
-    SELECT c.name, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id
-    WHERE p.pillar_name = ?
-    ORDER BY p.total_pillar_score DESC;
-    """
-    df = pd.read_sql_query(query, db_connection, params=(pillar_full_name,))
+    pillars = facts["pillars"]
+    df = (
+        pillars.loc[pillars['pillar_name'] == pillar_full_name, ['name', 'total_pillar_score']]
+        .sort_values('total_pillar_score', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
     if df.empty:
         return {}
     oic_mean = df['total_pillar_score'].mean()
@@ -530,15 +602,9 @@ def get_pillar_key_findings(pillar_full_name, db_connection):
     }
 
 
-def generate_policy_recommendations(country_name, db_connection):
+def generate_policy_recommendations(country_name, facts):
     """Evidence-based policy priorities based on weakest pillars vs OIC averages."""
-    query = """
-    SELECT c.name, p.pillar_name, p.total_pillar_score
-    FROM pillars p
-    JOIN countries c ON p.country_id = c.id;
-    """
-    df = pd.read_sql_query(query, db_connection)
-    df['pillar_short'] = df['pillar_name'].str.replace(r'^\w+\sPillar:\s', '', regex=True)
+    df = facts["pillars"][['name', 'pillar_short', 'total_pillar_score']]
 
     oic_avg = df.groupby('pillar_short')['total_pillar_score'].mean()
     country_df = df[df['name'] == country_name].copy()
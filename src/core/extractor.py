@@ -6,20 +6,16 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import PydanticOutputParser # <--- IMPORT THIS
 from dotenv import load_dotenv
+from functools import lru_cache
 import os
 
 from src.core.data_models import CountryData # Import from your models file
 # LLM_MODEL_NAME is not used here since the model is hardcoded, but we'll leave the import
 from src.config import LLM_MODEL_NAME 
 
-def create_rag_chain(file_path: str):
-    """Creates the structured RAG chain using Google Generative AI."""
-    load_dotenv() # Loads API key from .env file
-    api_key = os.getenv("GOOGLE_API_KEY")
-    
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not found in environment variables.")
-
+@lru_cache(maxsize=None)
+def load_vector_store(file_path: str, api_key: str):
+    """Splits and embeds a PDF into a FAISS index, once per file for the whole process."""
     loader = PyMuPDFLoader(file_path)
     documents = loader.load()
     
@@ -27,55 +23,20 @@ def create_rag_chain(file_path: str):
     texts = text_splitter.split_documents(documents)
     
     embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=api_key)
-    vector_store = FAISS.from_documents(texts, embeddings)
-    retriever = vector_store.as_retriever(search_kwargs={"k": 15})
-    
-    # --- 1. Create a Pydantic Output Parser ---
-    parser = PydanticOutputParser(pydantic_object=CountryData)
+    return FAISS.from_documents(texts, embeddings)
 
-    # --- 2. Define the Prompt Template with Format Instructions ---
-    prompt_template = """
-You are an expert data extraction system. Your task is to extract detailed information from the provided document context based on the user's question.
-Ensure you extract all nine pillars detailed in the context. Do not stop until all data for the requested country is included.
-You must format the output strictly as a JSON object that adheres to the schema provided below.
-
-CONTEXT:
-{context}
-
-QUESTION:
-{question}
-
-FORMAT INSTRUCTIONS:
-{format_instructions}
-"""
-    
-    prompt = ChatPromptTemplate.from_template(
-        template=prompt_template,
-        partial_variables={"format_instructions": parser.get_format_instructions()}
-    )
+def create_rag_chain(file_path: str):
+    """Creates the structured RAG chain using Google Generative AI."""
+    load_dotenv() # Loads API key from .env file
+    api_key = os.getenv("GOOGLE_API_KEY")
     
-    # --- 3. Initialize the Google Generative AI Model ---
-    # Using a powerful model like Gemini 1.5 Pro is recommended for this complex task.
-    llm = GoogleGenerativeAI(
-    model="gemini-1.5-pro-latest",
-    google_api_key=api_key,
-    temperature=0.1,
-    max_output_tokens=8192 
-)
-
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY not found in environment variables.")
 
-    # --- 4. Construct the RAG Chain with the Explicit Parser ---
-    rag_chain = (
-        {
-            "context": retriever,
-            "question": RunnablePassthrough()
-        }
-        | prompt
-        | llm
-        | parser # Pipe the LLM's string output to the parser
-    )
-    
-    return rag_chain
+    # The embedded index is shared by every chain built for this file; each
+    # chain only gets its own retriever view and prompt/LLM/parser pipeline
+    retriever = load_vector_store(file_path, api_key).as_retriever(search_kwargs={"k": 15})
+    return create_rag_chain_from_retriever(retriever)
 
 # src/core/extractor.py
 
@@ -89,6 +50,11 @@ def create_rag_chain_from_documents(documents: list):
     # Create a vector store and retriever just for the provided documents
     vector_store = FAISS.from_documents(documents, embeddings)
     retriever = vector_store.as_retriever(search_kwargs={"k": len(documents)}) # Use all chunks for context
+    return create_rag_chain_from_retriever(retriever)
+
+def create_rag_chain_from_retriever(retriever):
+    """Creates a structured RAG chain on top of an existing retriever."""
+    api_key = os.getenv("GOOGLE_API_KEY")
 
     parser = PydanticOutputParser(pydantic_object=CountryData)
     
@@ -53,6 +53,31 @@ CREATE TABLE IF NOT EXISTS sub_pillars (
 );
 """
 
+# --- Indexes for the app's lookups ---
+# countries.name is already indexed through its UNIQUE constraint.
+CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_countries_adei_rank ON countries (adei_rank);
+CREATE INDEX IF NOT EXISTS idx_dimension_summaries_country ON dimension_summaries (country_id);
+CREATE INDEX IF NOT EXISTS idx_pillars_country ON pillars (country_id, pillar_name);
+CREATE INDEX IF NOT EXISTS idx_pillars_name ON pillars (pillar_name, total_pillar_score);
+CREATE INDEX IF NOT EXISTS idx_sub_pillars_pillar ON sub_pillars (pillar_id);
+CREATE INDEX IF NOT EXISTS idx_sub_pillars_name ON sub_pillars (name);
+"""
+
+# --- Precomputed aggregates for the overview tab ---
+# The data only changes when this script runs, so the GROUP BY / ORDER BY work
+# is done once here and the app reads the results back as-is.
+CREATE_AGGREGATE_TABLES = """
+DROP TABLE IF EXISTS mv_avg_pillar;
+CREATE TABLE mv_avg_pillar AS
+    SELECT pillar_name, AVG(total_pillar_score) AS average_score
+    FROM pillars GROUP BY pillar_name ORDER BY pillar_name;
+-- Leaderboard copies from older versions of this script; the app now slices
+-- the countries table, and they only padded the chatbot's schema
+DROP TABLE IF EXISTS mv_top10;
+DROP TABLE IF EXISTS mv_bottom10;
+"""
+
 def create_database_schema(cursor):
     """Creates the database tables."""
     print("Creating database tables...")
@@ -62,6 +87,15 @@ def create_database_schema(cursor):
     cursor.execute(CREATE_SUB_PILLARS_TABLE)
     print("Tables created successfully.")
 
+def create_indexes(cursor):
+    """Creates the lookup indexes. Run after loading so inserts don't maintain them."""
+    cursor.executescript(CREATE_INDEXES)
+    cursor.execute("ANALYZE")
+
+def create_aggregate_tables(cursor):
+    """(Re)builds the mv_* aggregate tables from the loaded data."""
+    cursor.executescript(CREATE_AGGREGATE_TABLES)
+
 def load_data_into_db():
     """Parses the JSON file and loads the data into the SQLite database."""
     # Check if the JSON file exists
@@ -77,54 +111,75 @@ def load_data_into_db():
     # Connect to the SQLite database (it will be created if it doesn't exist)
     conn = sqlite3.connect(DB_FILE_PATH)
     cursor = conn.cursor()
+    # Only fsync at the commit, and keep sort/temp data in memory. The journal
+    # stays in rollback mode: the app opens this file read-only (immutable=1),
+    # which a WAL-mode database with its -wal/-shm side files doesn't suit
+    cursor.execute("PRAGMA synchronous=NORMAL;")
+    cursor.execute("PRAGMA temp_store=MEMORY;")
 
     # Create the tables
     create_database_schema(cursor)
 
     print("\nStarting data insertion...")
-    # Loop through each country in the JSON file
-    for country_data in all_countries_data:
-        if not country_data: continue # Skip empty entries
-
-        country_name = country_data.get('country_name')
-        print(f"Processing {country_name}...")
-
-        # --- 1. Insert into 'countries' table ---
-        cursor.execute(
-            "INSERT OR IGNORE INTO countries (name, adei_score, adei_rank) VALUES (?, ?, ?)",
+    # All inserts below run in one explicit transaction, committed once
+    cursor.execute("BEGIN")
+    all_countries_data = [country_data for country_data in all_countries_data if country_data] # Skip empty entries
+
+    # --- 1. Insert into 'countries' table ---
+    cursor.executemany(
+        "INSERT OR IGNORE INTO countries (name, adei_score, adei_rank) VALUES (?, ?, ?)",
+        [
             (
-                country_name,
+                country_data.get('country_name'),
                 country_data.get('overall_adei_score'),
                 country_data.get('overall_adei_rank')
             )
-        )
-        # Get the ID of the country we just inserted
-        country_id = cursor.execute("SELECT id FROM countries WHERE name = ?", (country_name,)).fetchone()[0]
-
-        # --- 2. Insert into 'dimension_summaries' table ---
-        for summary in country_data.get('dimension_summary', []):
-            cursor.execute(
-                """
-                INSERT INTO dimension_summaries (country_id, dimension, pillar, value, rank)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (country_id, summary['dimension'], summary['pillar'], summary['value'], summary['rank'])
-            )
-
-        # --- 3. Insert into 'pillars' and 'sub_pillars' tables ---
+            for country_data in all_countries_data
+        ]
+    )
+    # Look up every country's ID in one query (an ignored duplicate name maps to the existing row)
+    country_ids = dict(cursor.execute("SELECT name, id FROM countries").fetchall())
+
+    # --- 2. Insert into 'dimension_summaries' table ---
+    cursor.executemany(
+        """
+        INSERT INTO dimension_summaries (country_id, dimension, pillar, value, rank)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (country_ids[country_data.get('country_name')], summary['dimension'], summary['pillar'], summary['value'], summary['rank'])
+            for country_data in all_countries_data
+            for summary in country_data.get('dimension_summary', [])
+        ]
+    )
+
+    # --- 3. Insert into 'pillars' and 'sub_pillars' tables ---
+    # executemany can't report each row's lastrowid, so pillar IDs are assigned
+    # here, continuing from the AUTOINCREMENT counter just as the inserts would
+    last_pillar_id = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'pillars'").fetchone()
+    pillar_rows, sub_pillar_rows = [], []
+    pillar_id = last_pillar_id[0] if last_pillar_id else 0
+    for country_data in all_countries_data:
+        country_id = country_ids[country_data.get('country_name')]
         for pillar in country_data.get('detailed_pillars', []):
-            cursor.execute(
-                "INSERT INTO pillars (country_id, pillar_name, total_pillar_score) VALUES (?, ?, ?)",
-                (country_id, pillar['pillar_name'], pillar['total_pillar_score'])
+            pillar_id += 1
+            pillar_rows.append((pillar_id, country_id, pillar['pillar_name'], pillar['total_pillar_score']))
+            sub_pillar_rows.extend(
+                (pillar_id, sub_pillar['name'], sub_pillar['score'])
+                for sub_pillar in pillar.get('sub_pillars', [])
             )
-            # Get the ID of the pillar we just inserted
-            pillar_id = cursor.lastrowid
-
-            for sub_pillar in pillar.get('sub_pillars', []):
-                cursor.execute(
-                    "INSERT INTO sub_pillars (pillar_id, name, score) VALUES (?, ?, ?)",
-                    (pillar_id, sub_pillar['name'], sub_pillar['score'])
-                )
+    cursor.executemany(
+        "INSERT INTO pillars (id, country_id, pillar_name, total_pillar_score) VALUES (?, ?, ?, ?)",
+        pillar_rows
+    )
+    cursor.executemany(
+        "INSERT INTO sub_pillars (pillar_id, name, score) VALUES (?, ?, ?)",
+        sub_pillar_rows
+    )
+    print(f"Inserted {len(all_countries_data)} countries, {len(pillar_rows)} pillars and {len(sub_pillar_rows)} sub-pillars.")
+
+    create_indexes(cursor)
+    create_aggregate_tables(cursor)
 
     # Commit the changes and close the connection
     conn.commit()